@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
 
-import json
 from lib import *
 import math
 from pprint import pprint
 import sys
 
 # data config
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 PRECISION = 8
 
 # cup config in mm
@@ -56,15 +55,12 @@ mesh.processEdgeloops()
 data = [
     {
         "name": "BBTest",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range((VERTICES_PER_EDGE_LOOP/4)**2)
+        "location": CENTER
     }
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
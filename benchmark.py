@@ -0,0 +1,295 @@
+# Times and memory-profiles each generator stage and each piece at increasing resolutions, e.g.
+#   python benchmark.py                          # stages and pieces at SUBDIVIDE_X = SUBDIVIDE_Y = 0..6
+#   python benchmark.py -grid -levels 0 1 2 3    # every SUBDIVIDE_X, SUBDIVIDE_Y combination
+#   python benchmark.py -only processEdgeloops cup
+#   python benchmark.py -compare old.json        # exit with an error if anything got slower
+# Results are written as JSON (see -out). Stage cases use synthetic meshes of 16 * 2^x
+# vertices per loop and 16 * 2^y loops; piece cases run the piece's script with its
+# SUBDIVIDE_X/SUBDIVIDE_Y set to x and y. Every case runs in its own process so its
+# peak memory can be measured
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from meshlib import Mesh
+from meshlib.decimate import decimate
+from meshlib.displace import displaceAlongNormals, displaceWithImage
+from meshlib.export import writeSTL
+from meshlib.imagemap import ImageMap
+from meshlib.meshfile import readMeshFile, writeMeshFile
+from meshlib.orient import orientFaces
+from meshlib.shapes import circleMesh, ellipseMesh
+from meshlib.spline import bsplineBatch
+from meshlib.subdivide import subdivide
+from meshlib.sweep import generate, scriptConstants, scriptOutputs, scriptPath
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_FILE = os.path.join(ROOT, ".build", "benchmark.json")
+BASE_VERTICES = 16
+LEVELS = [0, 1, 2, 3, 4, 5, 6]
+PRECISION = 8
+DECIMATE_MAX_FACES = 200000 # decimating takes seconds per hundred thousand faces, so bigger cases are skipped
+
+PIECES = ["bbtest", "plate", "pot", "pot_lid", "sauce_dish", "spoon", "bowl", "cup"]
+SCRIPTS = ["plate/imgMap.py", "cup/imgMap.py"]
+
+def tempFile(name):
+    return os.path.join(tempfile.gettempdir(), "benchmark_%s_%s" % (os.getpid(), name))
+
+def cylinderLoops(x, y):
+    """ (L, V, 3) closed loops around a bumpy cylinder """
+    vertices = BASE_VERTICES * 2**x
+    loops = BASE_VERTICES * 2**y
+    a = np.linspace(0, 2 * math.pi, vertices, endpoint=False)
+    z = np.linspace(0, 100.0, loops)
+    r = 40.0 + 2.0 * np.sin(z[:, np.newaxis] * 0.3) + np.cos(a[np.newaxis, :] * 7)
+    return np.dstack((r * np.cos(a), r * np.sin(a), np.repeat(z[:, np.newaxis], vertices, axis=1)))
+
+def loopMesh(x, y):
+    """ A closed tube: a disc at each end joined by the cylinder's loops """
+    loops = cylinderLoops(x, y)
+    vertices = loops.shape[1]
+    mesh = Mesh()
+    mesh.addEdgeLoops(ellipseMesh(vertices, (0, 0, 0), 40.0, 40.0, 0.0))
+    mesh.addEdgeLoops(list(loops))
+    mesh.addEdgeLoops(list(reversed(ellipseMesh(vertices, (0, 0, 0), 40.0, 40.0, 100.0))))
+    mesh.processEdgeloops()
+    return mesh
+
+# each stage takes the resolution and returns a function to time, with a description of its input size
+def stagePrimitives(x, y):
+    vertices = BASE_VERTICES * 2**x
+    def run():
+        for i in range(2**y):
+            ellipseMesh(vertices, (0, 0, 0), 40.0, 30.0, i)
+            circleMesh(vertices, (0, 0, 0), 40.0, i)
+    return run, {"vertices": vertices, "discs": 2 * 2**y}
+
+def stageSpline(x, y):
+    anchors = cylinderLoops(x, 0).transpose(1, 0, 2)
+    n = BASE_VERTICES * 2**y
+    return lambda: bsplineBatch(anchors, n, periodic=False), {"splines": len(anchors), "anchors": anchors.shape[1], "samples": n}
+
+def stageDisplacement(x, y):
+    loops = cylinderLoops(x, y)
+    amounts = np.random.RandomState(0).rand(len(loops) - 2, loops.shape[1]) * 3.0
+    return lambda: displaceAlongNormals(loops[1:-1], loops[:-2], loops[2:], amounts), {"verts": amounts.size}
+
+def stageImageDisplacement(x, y):
+    pixels = ImageMap(os.path.join(ROOT, "plate", "imgMap.png")).pixels
+    verts = cylinderLoops(x, y).reshape(-1, 3)
+    bounds = [(-45.0, -45.0), (45.0, 45.0)]
+    return lambda: displaceWithImage(verts, pixels, bounds, (1.0, 1.0, 2.0), 1.0, (0, 0)), {"verts": len(verts)}
+
+def stageProcessEdgeloops(x, y):
+    def run():
+        mesh = loopMesh(x, y)
+        return len(mesh.faces)
+    return run, {"verts": len(loopMesh(x, y).verts)}
+
+def stageOrient(x, y):
+    faces = loopMesh(x, y).faces
+    return lambda: orientFaces(faces), {"faces": len(faces)}
+
+def stageRound(x, y):
+    verts = loopMesh(x, y).verts
+    return lambda: np.round(verts, PRECISION), {"verts": len(verts)}
+
+def stageSerialization(x, y):
+    mesh = loopMesh(x, y)
+    filename = tempFile("mesh.bin")
+    data = [{"name": "Benchmark", "verts": np.round(mesh.verts, PRECISION), "faces": mesh.faces, "location": (0, 0, 0)}]
+    def run():
+        writeMeshFile(filename, data)
+        o = readMeshFile(filename)[0]
+        total = float(o["verts"].sum()) + int(o["faces"].sum())
+        os.remove(filename)
+        return total
+    return run, {"verts": len(mesh.verts), "faces": len(mesh.faces)}
+
+def stageSubdivide(x, y):
+    mesh = loopMesh(x, y)
+    return lambda: subdivide(mesh.verts, mesh.faces, 1), {"faces": len(mesh.faces)}
+
+def stageDecimate(x, y):
+    mesh = loopMesh(x, y)
+    if len(mesh.faces) > DECIMATE_MAX_FACES:
+        return None, {"faces": len(mesh.faces)}
+    return lambda: decimate(mesh.verts, mesh.faces, 0.25), {"faces": len(mesh.faces)}
+
+def stageExport(x, y):
+    mesh = loopMesh(x, y)
+    filename = tempFile("mesh.stl")
+    def run():
+        writeSTL(filename, mesh.verts, mesh.faces)
+        os.remove(filename)
+    return run, {"faces": len(mesh.faces)}
+
+STAGES = [
+    ("primitives", stagePrimitives),
+    ("spline", stageSpline),
+    ("displacement", stageDisplacement),
+    ("imageDisplacement", stageImageDisplacement),
+    ("processEdgeloops", stageProcessEdgeloops),
+    ("orient", stageOrient),
+    ("rounding", stageRound),
+    ("serialization", stageSerialization),
+    ("subdivide", stageSubdivide),
+    ("decimate", stageDecimate),
+    ("export", stageExport)
+]
+
+def peakMB():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+def timeRuns(run, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.time()
+        run()
+        times.append(time.time() - start)
+    return min(times)
+
+def runScript(script, config):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        generate(script, config)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def runCase(case):
+    """ Run one case in this (fresh) process and return its result """
+    result = dict(case)
+    try:
+        if case["kind"] == "stage":
+            run, result["size"] = dict(STAGES)[case["name"]](case["x"], case["y"])
+            if run is None:
+                result["skipped"] = True
+                return result
+        else:
+            config = dict(case["config"])
+            outputs = []
+            # every file the script writes goes to a temporary file instead
+            for name in ["OUTPUT_FILE"] + sorted(scriptOutputs(case["name"]).keys()):
+                # keep the output's extension, which PIL uses to pick the image format
+                config[name] = tempFile("%s_%s" % (name.lower(), case["output"]))
+                outputs.append(config[name])
+            run = lambda: runScript(case["name"], config)
+        before = peakMB()
+        result["seconds"] = timeRuns(run, case["repeat"])
+        result["peakMB"] = peakMB()
+        result["extraMB"] = result["peakMB"] - before
+        if case["kind"] != "stage":
+            for filename in outputs:
+                if os.path.isfile(filename):
+                    os.remove(filename)
+    except Exception as e:
+        result["error"] = "%s: %s" % (type(e).__name__, e)
+    return result
+
+def resolutions(levels, grid):
+    if grid:
+        return [(x, y) for x in levels for y in levels]
+    return [(level, level) for level in levels]
+
+def benchmarkCases(levels, grid, only, repeat):
+    cases = []
+    for name, stage in STAGES:
+        if not only or name in only:
+            for x, y in resolutions(levels, grid):
+                cases.append({"kind": "stage", "name": name, "x": x, "y": y, "repeat": repeat})
+
+    for script in SCRIPTS:
+        if not only or script in only:
+            cases.append({"kind": "script", "name": script, "config": {}, "output": "imgMap.png", "repeat": 1})
+
+    for piece in PIECES:
+        if only and piece not in only:
+            continue
+        constants = scriptConstants(scriptPath(piece))
+        if "SUBDIVIDE_X" not in constants or "SUBDIVIDE_Y" not in constants:
+            cases.append({"kind": "piece", "name": piece, "config": {}, "output": "mesh.bin", "repeat": 1})
+            continue
+        for x, y in resolutions(levels, grid):
+            cases.append({"kind": "piece", "name": piece, "x": x, "y": y, "config": {"SUBDIVIDE_X": x, "SUBDIVIDE_Y": y}, "output": "mesh.bin", "repeat": 1})
+    return cases
+
+def caseId(result):
+    return "%s %s x%s y%s" % (result["kind"], result["name"], result.get("x", "-"), result.get("y", "-"))
+
+def compare(results, previous, threshold):
+    """ Results that are more than `threshold` times slower than before; ignores very short runs """
+    before = dict((caseId(r), r) for r in previous["results"] if "seconds" in r)
+    slower = []
+    for r in results:
+        old = before.get(caseId(r))
+        if old is None or "seconds" not in r:
+            continue
+        if r["seconds"] > 0.01 and r["seconds"] > old["seconds"] * threshold:
+            slower.append((caseId(r), old["seconds"], r["seconds"]))
+    return slower
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-levels', dest="LEVELS", type=int, nargs='+', default=LEVELS, help="SUBDIVIDE_X/SUBDIVIDE_Y values to run")
+    parser.add_argument('-grid', dest="GRID", action="store_true", help="Run every SUBDIVIDE_X, SUBDIVIDE_Y combination instead of equal pairs")
+    parser.add_argument('-only', dest="ONLY", nargs='+', default=[], help="Stage, piece or script names to run: %s" % ", ".join([s[0] for s in STAGES] + SCRIPTS + PIECES))
+    parser.add_argument('-repeat', dest="REPEAT", type=int, default=3, help="Times to run each stage case, keeping the fastest")
+    parser.add_argument('-workers', dest="WORKERS", type=int, default=1, help="Cases to run at once; more than one skews timings")
+    parser.add_argument('-out', dest="OUTPUT_FILE", default=OUTPUT_FILE, help="JSON file for the results")
+    parser.add_argument('-compare', dest="COMPARE_FILE", default="", help="Earlier results to check for regressions")
+    parser.add_argument('-threshold', dest="THRESHOLD", type=float, default=1.25, help="How many times slower counts as a regression")
+    args = parser.parse_args()
+
+    cases = benchmarkCases(args.LEVELS, args.GRID, args.ONLY, args.REPEAT)
+    print("Running %s benchmark cases" % len(cases))
+    pool = multiprocessing.Pool(args.WORKERS, maxtasksperchild=1)
+    results = []
+    for result in pool.imap(runCase, cases):
+        if "error" in result:
+            status = "failed: %s" % result["error"]
+        elif result.get("skipped"):
+            status = "skipped"
+        else:
+            status = "%.3fs, %.0fMB peak (+%.0fMB)" % (result["seconds"], result["peakMB"], result["extraMB"])
+        print("%s: %s" % (caseId(result), status))
+        results.append(result)
+    pool.close()
+    pool.join()
+
+    outputDir = os.path.dirname(os.path.abspath(args.OUTPUT_FILE))
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+    with open(args.OUTPUT_FILE, "w") as f:
+        json.dump({
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "cpus": multiprocessing.cpu_count(),
+            "results": results
+        }, f, indent=1, sort_keys=True)
+    print("Wrote results to %s" % args.OUTPUT_FILE)
+
+    if args.COMPARE_FILE:
+        with open(args.COMPARE_FILE) as f:
+            slower = compare(results, json.load(f), args.THRESHOLD)
+        for name, before, after in slower:
+            print("Slower: %s %.3fs -> %.3fs" % (name, before, after))
+        if len(slower) > 0:
+            sys.exit(1)
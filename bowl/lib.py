@@ -2,7 +2,14 @@
 
 import math
 import numpy as np
-from scipy import interpolate
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from meshlib import Mesh as BaseMesh
+from meshlib import spline
+from meshlib.meshfile import writeMeshFile
+from meshlib.shapes import circleRing, loopTuples
 
 def angleBetweenPoints(p1, p2):
     deltaX = p2[0] - p1[0]
@@ -11,42 +18,7 @@ def angleBetweenPoints(p1, p2):
     return math.degrees(rad)
 
 def bspline(cv, n=1000, degree=3, periodic=False):
-    """ Calculate n samples on a bspline
-
-        cv :      Array ov control vertices
-        n  :      Number of samples to return
-        degree:   Curve degree
-        periodic: True - Curve is closed
-                  False - Curve is open
-    """
-
-    # If periodic, extend the point array by count+degree+1
-    cv = np.asarray(cv)
-    count = len(cv)
-
-    if periodic:
-        factor, fraction = divmod(count+degree+1, count)
-        cv = np.concatenate((cv,) * factor + (cv[:fraction],))
-        count = len(cv)
-        degree = np.clip(degree,1,degree)
-
-    # If opened, prevent degree from exceeding count-1
-    else:
-        degree = np.clip(degree,1,count-1)
-
-
-    # Calculate knot vector
-    kv = None
-    if periodic:
-        kv = np.arange(0-degree,count+degree+degree-1)
-    else:
-        kv = np.clip(np.arange(count+degree+1)-degree,0,count-degree)
-
-    # Calculate query range
-    u = np.linspace(periodic,(count-degree),n)
-
-    # Calculate result
-    return np.array(interpolate.splev(u, (kv,cv.T,degree))).T.tolist()
+    return spline.bspline(cv, n, degree, periodic)
 
 def bsplineLerp(plist, mu):
     count = 10000
@@ -55,15 +27,7 @@ def bsplineLerp(plist, mu):
     return tuple(spl[i])
 
 def circle(vertices, center, r, z):
-    angle = 360.0 / vertices
-
-    result = []
-    for i in range(vertices):
-        a = i * angle
-        p = translatePoint(center, a, r)
-        result.append((p[0], p[1], z))
-
-    return result
+    return loopTuples(circleRing(vertices, center, r, z))
 
 def lerp(a, b, mu):
     return (b-a) * mu + a
@@ -75,13 +39,6 @@ def normalBetweenPoints(p1, p2):
     angle = angleBetweenPoints(p1, p2)
     return angle + 90
 
-def roundP(vList, precision):
-    rounded = []
-    for v in vList:
-        t = (round(v[0], precision), round(v[1], precision), round(v[2], precision))
-        rounded.append(t)
-    return rounded
-
 def translatePoint(p, degrees, distance):
     radians = math.radians(degrees)
     x2 = p[0] + distance * math.cos(radians)
@@ -159,25 +116,15 @@ def getVerticesFromFace(bl, br, tr, tl, displaceAmount):
 
     return verts
 
-class Mesh:
+class Mesh(BaseMesh):
 
     def __init__(self):
-        self.verts = []
-        self.edges = []
-        self.faces = []
-        self.edgeLoops = []
+        BaseMesh.__init__(self)
         self.displaceLoops = []
 
     def addDisplaceLoop(self, value):
         self.displaceLoops.append(value)
 
-    def addEdgeLoop(self, loop):
-        self.edgeLoops.append(loop)
-
-    def addEdgeLoops(self, loops):
-        for loop in loops:
-            self.addEdgeLoop(loop)
-
     def closeEdgeLoop(self, loop, indexOffset, end=False):
         faces = []
         loopLen = len(loop)
@@ -190,7 +137,7 @@ class Mesh:
                 faces.append((indexOffset+loopLen, indexOffset+a, indexOffset+b))
             else:
                 faces.append((indexOffset, indexOffset+a+1, indexOffset+b+1))
-        self.faces += faces
+        self.addFaces(faces)
 
     def displaceEdgeLoops(self, loopA, loopB, indexOffset, amount):
         faces = []
@@ -200,7 +147,7 @@ class Mesh:
         if aLen != bLen:
             print "Warning: length mismatch"
 
-        initialIndexOffset = len(self.verts)
+        initialIndexOffset = self.vertCount
 
         # assume equal number of vertices
         for i in range(aLen):
@@ -220,24 +167,23 @@ class Mesh:
             tr = self.verts[v3]
             tl = self.verts[v4]
             newVerts = getVerticesFromFace(bl, br, tr, tl, amount)
-            self.verts += newVerts
+            self.appendVerts(newVerts)
 
             u = initialIndexOffset
-            self.faces.append((v1, v2, u+1, u))
-            self.faces.append((v2, v3, u+2, u+1))
-            self.faces.append((v3, v4, u+3, u+2))
-            self.faces.append((v4, v1, u, u+3))
+            faces.append((v1, v2, u+1, u))
+            faces.append((v2, v3, u+2, u+1))
+            faces.append((v3, v4, u+3, u+2))
+            faces.append((v4, v1, u, u+3))
             v = u + 4
-            self.faces.append((u, u+1, v+1, v))
-            self.faces.append((u+1, u+2, v+2, v+1))
-            self.faces.append((u+2, u+3, v+3, v+2))
-            self.faces.append((u+3, u, v, v+3))
-            self.faces.append((v, v+1, v+2, v+3))
+            faces.append((u, u+1, v+1, v))
+            faces.append((u+1, u+2, v+2, v+1))
+            faces.append((u+2, u+3, v+3, v+2))
+            faces.append((u+3, u, v, v+3))
+            faces.append((v, v+1, v+2, v+3))
 
-            initialIndexOffset = len(self.verts)
+            initialIndexOffset = self.vertCount
 
-    def getVertexCount(self):
-        return sum([len(l) for l in self.edgeLoops])
+        self.addFaces(faces)
 
     def joinEdgeLoops(self, loopA, loopB, indexOffset):
         faces = []
@@ -259,7 +205,7 @@ class Mesh:
 
             faces.append((v1+indexOffset, v2+indexOffset, v3+indexOffset, v4+indexOffset))
 
-        self.faces += faces
+        self.addFaces(faces)
 
     # join all the edge loop together
     def processEdgeloops(self):
@@ -270,7 +216,7 @@ class Mesh:
             displace = self.displaceLoops[i]
 
             # add loop's vertices
-            self.verts += edgeLoop
+            self.appendVerts(edgeLoop)
 
             # skip start
             if i <= 0:
@@ -306,3 +252,5 @@ class Mesh:
                 self.displaceEdgeLoops(prev, edgeLoop, indexOffset, displace)
 
             indexOffset += len(prev)
+
+        self.orientFaces()
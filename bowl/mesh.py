@@ -7,14 +7,13 @@
 # 690 miles of track = https://www.gilderlehrman.org/sites/default/files/inline-pdfs/Transcontinental%20Railroad%20Fact%20Sheet.pdf
 
 import csv
-import json
 from lib import *
 import os
 from pprint import pprint
 import sys
 
 # data config
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 
 # 3 × 230 = 690
 # 5 × 138 = 690
@@ -109,15 +108,12 @@ mesh.processEdgeloops()
 data = [
     {
         "name": "Bowl",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range(VERTICES_PER_EDGE_LOOP)
+        "location": CENTER
     }
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
@@ -0,0 +1,273 @@
+# Builds every piece of the collection, running independent pieces in parallel, e.g.
+#   python build.py              # everything that is out of date
+#   python build.py cup pot_lid  # just these and whatever they depend on
+#   python build.py -force -workers 4
+# Each target's script is run from its own folder, the same as running it by hand.
+# Outputs are cached under .build/cache, keyed by a hash of the target's script
+# (which holds its config constants), arguments, input files and meshlib, so a
+# target whose inputs haven't changed is restored from the cache instead of rebuilt
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(ROOT, ".build", "logs")
+CACHE_DIR = os.path.join(ROOT, ".build", "cache")
+CACHE_SIZE = 2048 # in MB; least recently used entries are removed past this
+
+# paths are relative to the target's folder; a target depends on any target whose outputs it reads
+TARGETS = [
+    {"name": "plate/imgMap", "dir": "plate", "script": "imgMap.py", "inputs": ["data/DistributionOfSlip.json"], "outputs": ["imgMap.png"]},
+    {"name": "plate", "dir": "plate", "script": "mesh.py", "inputs": ["lib.py", "imgMap.png"], "outputs": ["mesh.bin"]},
+    {"name": "cup/imgMap", "dir": "cup", "script": "imgMap.py", "inputs": ["chars"], "outputs": ["imgMap.png"]},
+    {"name": "cup", "dir": "cup", "script": "mesh.py", "inputs": ["imgMap.png"], "outputs": ["mesh.bin"]},
+    {"name": "pot", "dir": "pot", "script": "mesh.py", "inputs": ["lib.py"], "outputs": ["mesh.bin", "pot_lid_config.json"]},
+    {"name": "pot_lid", "dir": "pot_lid", "script": "mesh.py", "inputs": ["lib.py", "../pot/pot_lid_config.json"], "outputs": ["mesh.bin"]},
+    {"name": "spoon", "dir": "spoon", "script": "mesh.py", "inputs": ["lib.py", "data.csv"], "outputs": ["mesh.bin"]},
+    {"name": "bowl", "dir": "bowl", "script": "mesh.py", "inputs": ["lib.py"], "outputs": ["mesh.bin"]},
+    {"name": "sauce_dish", "dir": "sauce_dish", "script": "mesh.py", "inputs": ["lib.py"], "outputs": ["mesh.bin"]},
+    {"name": "sauce_dish/both_08", "dir": "sauce_dish", "script": "mesh.py", "args": ["-out", "both/mesh_08.bin", "-offset", "-22"], "inputs": ["lib.py"], "outputs": ["both/mesh_08.bin"]},
+    {"name": "sauce_dish/both_20", "dir": "sauce_dish", "script": "mesh.py", "args": ["-out", "both/mesh_20.bin", "-offset", "22", "-percent", "0.2"], "inputs": ["lib.py"], "outputs": ["both/mesh_20.bin"]},
+    {"name": "bbtest", "dir": "bbtest", "script": "mesh.py", "inputs": ["lib.py"], "outputs": ["mesh.bin"]}
+]
+
+# every target also depends on the shared library
+SHARED_INPUTS = ["meshlib"]
+
+def targetPath(target, path):
+    return os.path.normpath(os.path.join(ROOT, target["dir"], path))
+
+def inputPaths(target):
+    paths = [targetPath(target, target["script"])]
+    paths += [targetPath(target, p) for p in target["inputs"]]
+    paths += [os.path.join(ROOT, p) for p in SHARED_INPUTS]
+    return paths
+
+def outputPaths(target):
+    return [targetPath(target, p) for p in target["outputs"]]
+
+def expandPaths(paths):
+    """ Files under the given paths, walking into folders """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+                files += [os.path.join(dirpath, f) for f in sorted(filenames) if not f.endswith((".pyc", ".npy"))]
+        else:
+            files.append(path)
+    return files
+
+def dependencyGraph(targets):
+    """ Map of target name to the names of the targets it depends on """
+    producers = {}
+    for t in targets:
+        for path in outputPaths(t):
+            producers[path] = t["name"]
+    graph = {}
+    for t in targets:
+        graph[t["name"]] = sorted(set(producers[p] for p in inputPaths(t) if p in producers and producers[p] != t["name"]))
+    return graph
+
+def withDependencies(names, graph):
+    selected = set()
+    queue = list(names)
+    while len(queue) > 0:
+        name = queue.pop()
+        if name not in selected:
+            selected.add(name)
+            queue += graph[name]
+    return selected
+
+def fileHash(filename):
+    h = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def targetKey(target):
+    """ Hash of everything that determines a target's outputs, or None if an input is missing """
+    h = hashlib.sha1()
+    h.update(("%s\n%s\n%s\n" % (sys.version, target["script"], json.dumps(target.get("args", [])))).encode("utf-8"))
+    for path in expandPaths(inputPaths(target)):
+        if not os.path.isfile(path):
+            return None
+        h.update(("%s %s\n" % (os.path.relpath(path, ROOT).replace(os.sep, "/"), fileHash(path))).encode("utf-8"))
+    return h.hexdigest()
+
+class BuildCache(object):
+    """ Target outputs stored by key, with an index of their sizes and last use for LRU eviction """
+
+    def __init__(self, directory=CACHE_DIR, maxSize=CACHE_SIZE):
+        self.directory = directory
+        self.maxBytes = maxSize * 1024 * 1024
+        self.indexFile = os.path.join(directory, "index.json")
+        self.index = {}
+        if os.path.isfile(self.indexFile):
+            with open(self.indexFile) as f:
+                self.index = json.load(f)
+
+    def save(self):
+        self.evict()
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        with open(self.indexFile, "w") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+
+    def has(self, key):
+        return key is not None and key in self.index and os.path.isdir(os.path.join(self.directory, key))
+
+    def restore(self, key, target):
+        """ Copy a cached entry's outputs into place, leaving outputs that already match alone;
+            returns how many files were copied
+        """
+        entry = self.index[key]
+        entry["used"] = time.time()
+        copied = 0
+        for i, path in enumerate(outputPaths(target)):
+            if os.path.isfile(path) and fileHash(path) == entry["hashes"][i]:
+                continue
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            shutil.copyfile(os.path.join(self.directory, key, str(i)), path)
+            copied += 1
+        return copied
+
+    def store(self, key, target):
+        entryDir = os.path.join(self.directory, key)
+        if os.path.isdir(entryDir):
+            shutil.rmtree(entryDir)
+        os.makedirs(entryDir)
+        hashes = []
+        size = 0
+        for i, path in enumerate(outputPaths(target)):
+            shutil.copyfile(path, os.path.join(entryDir, str(i)))
+            hashes.append(fileHash(path))
+            size += os.path.getsize(path)
+        self.index[key] = {"target": target["name"], "hashes": hashes, "size": size, "used": time.time()}
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """ Remove least recently used entries until the cache fits """
+        total = sum(entry["size"] for entry in self.index.values())
+        for key in sorted(self.index.keys(), key=lambda k: self.index[k]["used"]):
+            if total <= self.maxBytes:
+                break
+            if key == keep:
+                continue
+            total -= self.index[key]["size"]
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            del self.index[key]
+
+def startTarget(target):
+    logFile = os.path.join(LOG_DIR, target["name"].replace("/", "_") + ".log")
+    log = open(logFile, "w")
+    command = [sys.executable, target["script"]] + target.get("args", [])
+    process = subprocess.Popen(command, cwd=os.path.join(ROOT, target["dir"]), stdout=log, stderr=subprocess.STDOUT)
+    return process, log, logFile
+
+def cpuCount():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+def build(names=None, workers=None, force=False, dryRun=False, cacheSize=CACHE_SIZE):
+    """ Run the given targets (all by default) and their dependencies; returns the names that failed """
+    lookup = dict((t["name"], t) for t in TARGETS)
+    graph = dependencyGraph(TARGETS)
+    selected = withDependencies(names if names else list(lookup.keys()), graph)
+    if workers is None or workers <= 0:
+        workers = max(1, min(len(selected), cpuCount()))
+    if not os.path.isdir(LOG_DIR):
+        os.makedirs(LOG_DIR)
+    cache = BuildCache(maxSize=cacheSize)
+
+    # targets are taken in table order as their dependencies finish
+    pending = [t["name"] for t in TARGETS if t["name"] in selected]
+    running = {}
+    done = set()
+    rebuilt = set()
+    failed = []
+    start = time.time()
+
+    while len(pending) > 0 or len(running) > 0:
+        for name in list(pending):
+            deps = graph[name]
+            if any(d in failed for d in deps):
+                print("Skipping %s: %s failed" % (name, ", ".join(d for d in deps if d in failed)))
+                pending.remove(name)
+                failed.append(name)
+                continue
+            if not all(d in done for d in deps) or len(running) >= workers:
+                continue
+            pending.remove(name)
+            target = lookup[name]
+            if dryRun and any(d in rebuilt for d in deps):
+                print("Would build: %s" % name)
+                rebuilt.add(name)
+                done.add(name)
+                continue
+            key = targetKey(target)
+            if not force and cache.has(key):
+                if dryRun:
+                    print("Cached: %s" % name)
+                elif cache.restore(key, target) > 0:
+                    print("Restored %s from cache" % name)
+                else:
+                    print("Up to date: %s" % name)
+                done.add(name)
+                continue
+            rebuilt.add(name)
+            if dryRun:
+                print("Would build: %s" % name)
+                done.add(name)
+                continue
+            print("Building %s..." % name)
+            running[name] = startTarget(target) + (time.time(), key)
+
+        for name, (process, log, logFile, started, key) in list(running.items()):
+            if process.poll() is None:
+                continue
+            log.close()
+            del running[name]
+            if process.returncode == 0:
+                print("Built %s in %.1fs" % (name, time.time() - started))
+                if key is not None:
+                    cache.store(key, lookup[name])
+                done.add(name)
+            else:
+                print("Failed %s (exit code %s), see %s" % (name, process.returncode, logFile))
+                failed.append(name)
+
+        if len(running) > 0:
+            time.sleep(0.05)
+
+    if not dryRun:
+        cache.save()
+    print("Finished in %.1fs" % (time.time() - start))
+    return failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('targets', nargs='*', help="Targets to build (default is all): %s" % ", ".join(t["name"] for t in TARGETS))
+    parser.add_argument('-workers', dest="WORKERS", type=int, default=0, help="Pieces to build at once (default is one per core)")
+    parser.add_argument('-force', dest="FORCE", action="store_true", help="Rebuild even if cached")
+    parser.add_argument('-cache', dest="CACHE_SIZE", type=int, default=CACHE_SIZE, help="Cache size in MB")
+    parser.add_argument('-n', dest="DRY_RUN", action="store_true", help="Only print what would be built")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.targets if name not in [t["name"] for t in TARGETS]]
+    if len(unknown) > 0:
+        parser.error("Unknown targets: %s" % ", ".join(unknown))
+
+    failed = build(args.targets, args.WORKERS, args.FORCE, args.DRY_RUN, args.CACHE_SIZE)
+    sys.exit(1 if len(failed) > 0 else 0)
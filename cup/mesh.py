@@ -1,23 +1,27 @@
 # -*- coding: utf-8 -*-
 
-import colorsys
-import json
 import math
 import numpy as np
-from PIL import Image, ImageDraw
+import os
 from pprint import pprint
-from scipy import interpolate
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from meshlib import Mesh as BaseMesh
+from meshlib.displace import displaceAlongNormals, roundIndex
+from meshlib.imagemap import ImageMap
+from meshlib.meshfile import writeMeshFile
+from meshlib.shapes import circleMesh, circleRing, loopTuples, roundedRectRing
+from meshlib.spline import bsplineBatch
+
 # data config
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 PRECISION = 8
 IMAGE_MAP_FILE = "imgMap.png"
 
 # retrieve image map data
-im = Image.open(IMAGE_MAP_FILE)
-IMAGE_MAP_W, IMAGE_MAP_H = im.size
-IMAGE_MAP = list(im.getdata())
+IMAGE_MAP = ImageMap(IMAGE_MAP_FILE)
+IMAGE_MAP_W, IMAGE_MAP_H = IMAGE_MAP.width, IMAGE_MAP.height
 
 # cup config in mm
 BASE_VERTICES = 16 # don't change this as it will break rounded rectangles
@@ -56,192 +60,26 @@ INNER_BODY_HEIGHT = BODY_HEIGHT * 1.3
 print "Max height for text: %smm" % (NECK_HEIGHT - BASE_HEIGHT - THICKNESS)
 print "Max width for text: %smm" % (BODY_DIAMETER - THICKNESS * 2)
 
-def bspline(cv, n=100, degree=3, periodic=True):
-    """ Calculate n samples on a bspline
-
-        cv :      Array ov control vertices
-        n  :      Number of samples to return
-        degree:   Curve degree
-        periodic: True - Curve is closed
-                  False - Curve is open
-    """
-
-    # If periodic, extend the point array by count+degree+1
-    cv = np.asarray(cv)
-    count = len(cv)
-
-    if periodic:
-        factor, fraction = divmod(count+degree+1, count)
-        cv = np.concatenate((cv,) * factor + (cv[:fraction],))
-        count = len(cv)
-        degree = np.clip(degree,1,degree)
-
-    # If opened, prevent degree from exceeding count-1
-    else:
-        degree = np.clip(degree,1,count-1)
-
-
-    # Calculate knot vector
-    kv = None
-    if periodic:
-        kv = np.arange(0-degree,count+degree+degree-1)
-    else:
-        kv = np.clip(np.arange(count+degree+1)-degree,0,count-degree)
-
-    # Calculate query range
-    u = np.linspace(periodic,(count-degree),n)
-
-    # Calculate result
-    return np.array(interpolate.splev(u, (kv,cv.T,degree))).T.tolist()
-
 def bsplineEdgeLoops(loops, targetLength):
-    splinedLoops = [[] for l in range(targetLength)]
-    vertices = len(loops[0])
-    for i in range(vertices):
-        cv = [loop[i] for loop in loops]
-        splined = bspline(cv, n=targetLength, periodic=False)
-        for j, v in enumerate(splined):
-            splinedLoops[j].append(v)
-    return splinedLoops
+    # spline every vertex column through the loops at once
+    columns = np.swapaxes(np.array(loops, dtype=np.float64), 0, 1)
+    splined = bsplineBatch(columns, n=targetLength, periodic=False)
+    return np.swapaxes(splined, 0, 1).tolist()
 
 def circle(vertices, center, radius, z):
-    angleStart = -135
-    angleStep = 360.0 / vertices
-    c = []
-    for i in range(vertices):
-        angle = angleStart + angleStep * i
-        p = translatePoint(center, angle, radius)
-        c.append((p[0], p[1], z))
-    return c
-
-def circleMesh(vertices, center, radius, z, reverse=False):
-    verts = []
-    edgesPerSide = vertices / 4
-
-    # create a square matrix of vertices mapped to circular disc coordinates (UV)
-    # https://stackoverflow.com/questions/13211595/how-can-i-convert-coordinates-on-a-circle-to-coordinates-on-a-square
-    for row in range(edgesPerSide+1):
-        for col in range(edgesPerSide+1):
-            # x, y is between -1 and 1
-            x = 1.0 * col / edgesPerSide * 2 - 1
-            y = 1.0 * row / edgesPerSide * 2 - 1
-            u = x * math.sqrt(1.0 - 0.5 * (y * y))
-            v = y * math.sqrt(1.0 - 0.5 * (x * x))
-            # convert to actual unit
-            u = u * radius + center[0]
-            v = v * radius + center[1]
-            verts.append((u,v,z))
-
-    vertLen = len(verts)
-    centerIndex = int(vertLen / 2)
-    centerRow = edgesPerSide / 2
-    centerCol = edgesPerSide/ 2
-
-    # start with one point at the center
-    edgeLoops = [[verts[centerIndex]]]
-
-    # add loops until we reach outer loop
-    edges = 2
-    while edges <= edgesPerSide:
-        edgeLoop = []
-        r = edges/2
-        # add top
-        for i in range(edges):
-            row = centerRow - r
-            col = centerCol + lerp(-r, r, 1.0 * i / edges)
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add right
-        for i in range(edges):
-            row = centerRow + lerp(-r, r, 1.0 * i / edges)
-            col = centerCol + r
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add bottom
-        for i in range(edges):
-            row = centerRow + r
-            col = centerCol + lerp(r, -r, 1.0 * i / edges)
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add left
-        for i in range(edges):
-            row = centerRow + lerp(r, -r, 1.0 * i / edges)
-            col = centerCol - r
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add edges
-        edgeLoops.append(edgeLoop)
-        edges += 2
-
-    if reverse:
-        edgeLoops = reversed(edgeLoops)
-
-    return edgeLoops
-
-def displaceEdgeLoop(loop, loopBefore, loopAfter, pixelRow, depth, direction="out"):
-    displaced = []
-
-    for i, p in enumerate(loop):
-        x = 1.0 - 1.0 * i / (len(loop)-1)
-        ii = int(round(x * (len(pixelRow)-1)))
-        rgb = pixelRow[ii]
-        hls = colorsys.rgb_to_hls(rgb[0]/255.0, rgb[1]/255.0, rgb[2]/255.0)
-        displace = depth * (1.0 - hls[1])
-
-        j = i + 1
-        h = i - 1
-        if j >= len(loop):
-            j = 0
-
-        p0 = p
-        p1 = loopBefore[h]
-        p2 = loopBefore[j]
-        p3 = loopAfter[i]
-
-        # normalize Z
-        deltaZBefore = p1[2] - p0[2]
-        deltaZAfter = p3[2] - p0[2]
-        p0 = (p0[0], p0[1], 0)
-        p1 = (p1[0], p1[1], deltaZBefore)
-        p2 = (p2[0], p2[1], deltaZBefore)
-        p3 = (p3[0], p3[1], deltaZAfter)
-
-        # calculate normal of triangle made from points above, below, and adjacent
-        # https://stackoverflow.com/questions/19350792/calculate-normal-of-a-single-triangle-in-3d-space
-        p1 = np.array(p1)
-        p2 = np.array(p2)
-        p3 = np.array(p3)
-
-        # if we want normals to go away from center
-        u = p3 - p1
-        v = p2 - p1
-
-        # if we want normals to go towards center
-        if direction == "in":
-            u = p2 - p1
-            v = p3 - p1
-
-        # cross product is the normal
-        n = np.cross(u, v)
-
-        # calculate distance bewteen point and normal
-        # https://math.stackexchange.com/questions/105400/linear-interpolation-in-3-dimensions
-        p0 = np.array(p0)
-        p1 = n
-        dist = p1 - p0
-        ndist = np.linalg.norm(dist)
-        pd = p0 - (displace / ndist) * dist
-        pd = tuple(pd)
-        pd = (pd[0], pd[1], pd[2] + p[2])
-
-        displaced.append(pd)
-
-    return displaced
+    return loopTuples(circleRing(vertices, center, radius, z, angleStart=-135))
+
+# displace the inner loops of an (L, V, 3) block; the first and last loops are only used as neighbours
+def displaceEdgeLoops(loops, lightnessRows, depth, direction="out"):
+    loops = np.asarray(loops, dtype=np.float64)
+    vertices = loops.shape[1]
+
+    # each loop reads its pixel row from right to left
+    x = 1.0 - 1.0 * np.arange(vertices) / (vertices-1)
+    cols = roundIndex(x * (lightnessRows.shape[1]-1))
+    displace = depth * (1.0 - lightnessRows[:, cols])
 
+    return displaceAlongNormals(loops[1:-1], loops[:-2], loops[2:], displace, direction)
 
 def distance(p1, p2):
     x1, y1, z1 = p1
@@ -279,44 +117,7 @@ def norm(value, a, b):
     return 1.0 * (value - a) / (b - a)
 
 def roundedSquare(vertices, c, w, z, r):
-    square = []
-    hw = w * 0.5
-
-    # top left -> top right
-    y = c[1] - hw
-    x = c[0] - hw
-    square += [(x, y), (x + r, y), (c[0], y), (x + w - r, y)]
-    # top right to bottom right
-    x = c[0] + hw
-    y = c[1] - hw
-    square += [(x, y), (x, y+r), (x, c[1]), (x, y + w - r)]
-    # bottom right to bottom left
-    y = c[1] + hw
-    x = c[0] + hw
-    square += [(x, y), (x - r, y), (c[0], y), (x - w + r, y)]
-    # bottom left to top left
-    x = c[0] - hw
-    y = c[1] + hw
-    square += [(x, y), (x, y - r), (x, c[1]), (x, y - w + r)]
-
-    # use b-spline for rounding
-    rounded = bspline(square, vertices+1)
-    # offset
-    rounded = rounded[:-1]
-    offset = vertices / 8
-    a = rounded[(vertices-offset):]
-    b = rounded[:(vertices-offset)]
-    rounded = a + b
-    # add z
-    rounded = [(r[0], r[1], z) for r in rounded]
-    return rounded
-
-def roundP(vList, precision):
-    rounded = []
-    for v in vList:
-        t = (round(v[0], precision), round(v[1], precision), round(v[2], precision))
-        rounded.append(t)
-    return rounded
+    return loopTuples(roundedRectRing(vertices, c, w, w, z, r, smooth=True))
 
 def transform(vList, scale, translate):
     transformed = []
@@ -338,14 +139,10 @@ def translatePoint(p, degrees, distance):
     y2 = p[1] + distance * math.sin(radians)
     return (x2, y2)
 
-class Mesh:
+class Mesh(BaseMesh):
 
     def __init__(self):
-        self.verts = []
-        self.edges = []
-        self.faces = []
-        self.edgeLoops = []
-
+        BaseMesh.__init__(self)
         self.queueLoopAfter = False
 
     def addEdgeLoop(self, loop, loopBefore=False, loopAfter=False):
@@ -360,11 +157,7 @@ class Mesh:
         if loopAfter is not False:
             self.queueLoopAfter = loopAfter
 
-        self.edgeLoops.append(loop)
-
-    def addEdgeLoops(self, loops):
-        for loop in loops:
-            self.addEdgeLoop(loop)
+        BaseMesh.addEdgeLoop(self, loop)
 
     def addEdgeLoopHelper(self, nextLoop, amount, after=True):
         prevLoop = self.edgeLoops[-1]
@@ -376,97 +169,7 @@ class Mesh:
         if not after:
             lerpAmount = 1.0 - lerpAmount
         loop = lerpEdge(prevLoop, nextLoop, lerpAmount)
-        self.edgeLoops.append(loop)
-
-    def joinEdgeLoops(self, loopA, loopB, indexOffset):
-        faces = []
-        aLen = len(loopA)
-        bLen = len(loopB)
-
-        # number of vertices differ
-        if abs(bLen - aLen) > 0:
-
-            # assume we're going from bigger to smaller
-            bigger = aLen
-            smaller = bLen
-            biggerOffset = indexOffset
-            smallerOffset = indexOffset + aLen
-
-            # going from smaller to bigger
-            if smaller > bigger:
-                bigger = bLen
-                smaller = aLen
-                smallerOffset = indexOffset
-                biggerOffset = indexOffset + aLen
-
-            edgesPerSide = bigger / 4
-
-            for i in range(bigger-4):
-                offset = abs(i-1) / (edgesPerSide-1)
-                v1 = i + offset + biggerOffset
-                v2 = v1 + 1
-                v3 = i + offset - offset * 2 + smallerOffset
-                v4 = v3 - 1
-
-                # special case for first
-                if i==0:
-                    v1 = biggerOffset
-                    v2 = v1 + 1
-                    v3 = smallerOffset
-                    v4 = bigger - 1 + biggerOffset
-
-                # special case for reach corner face
-                elif i % (edgesPerSide-1) == 0:
-                    v3 = v2 + 1
-
-                # special case for last
-                elif i==(bigger-5):
-                    v3 = smallerOffset
-
-                faces.append((v1, v2, v3, v4))
-
-        # equal number of vertices
-        else:
-            for i in range(aLen):
-                v1 = i
-                v2 = i + 1
-                v3 = i + 1 + aLen
-                v4 = i + aLen
-                if v2 >= aLen:
-                    v2 = 0
-                    v3 = aLen
-                faces.append((v1+indexOffset, v2+indexOffset, v3+indexOffset, v4+indexOffset))
-
-        self.faces += faces
-
-    # join all the edge loop together
-    def processEdgeloops(self):
-        indexOffset = 0
-
-        for i, edgeLoop in enumerate(self.edgeLoops):
-            # add loop's vertices
-            self.verts += edgeLoop
-
-            # if this is the first edge loop and it's a quad, add it's face
-            if i == 0 and len(edgeLoop) == 4:
-                self.faces.append(range(4))
-
-            elif i > 0:
-                prev = self.edgeLoops[i-1]
-                self.joinEdgeLoops(prev, edgeLoop, indexOffset)
-                indexOffset += len(prev)
-
-        # if the last edge loop is a quad, add it's face
-        if len(self.edgeLoops[-1]) == 4:
-            self.faces.append([(i+indexOffset) for i in range(4)])
-
-    def updateEdgeLoops(self, loops, offset0=None, offset1=None):
-        if offset0 is None and offset1 is None:
-            self.edgeLoops = loops[:]
-        else:
-            before = self.edgeLoops[:offset0]
-            after = self.edgeLoops[offset1:]
-            self.edgeLoops = before + loops + after
+        BaseMesh.addEdgeLoop(self, loop)
 
 # determine center
 halfWidth = TOP_WIDTH * 0.5
@@ -558,18 +261,12 @@ displacedEdgeLoops = []
 print "Displacing %s edge loops" % len(originalEdgeLoops)
 z0 = originalEdgeLoops[0][0][2]
 z1 = originalEdgeLoops[-1][0][2]
-for i, edgeLoop in enumerate(originalEdgeLoops):
-    # don't displace edges
-    if i > 0 and i < len(originalEdgeLoops)-1:
-        py = norm(edgeLoop[0][2], z0, z1)
-        y = int(py * IMAGE_MAP_H)
-        offset = int(y * IMAGE_MAP_W)
-        pixelRow = IMAGE_MAP[offset:(offset+IMAGE_MAP_W)]
-        displacedLoop = displaceEdgeLoop(edgeLoop, originalEdgeLoops[i-1], originalEdgeLoops[i+1], pixelRow, DISPLACEMENT_DEPTH)
-        displacedEdgeLoops.append(displacedLoop)
-
-    else:
-        displacedEdgeLoops.append(edgeLoop)
+loopBlock = np.array(originalEdgeLoops, dtype=np.float64)
+# don't displace edges
+py = 1.0 * (loopBlock[1:-1, 0, 2] - z0) / (z1 - z0)
+lightnessRows = IMAGE_MAP.lightness[(py * IMAGE_MAP_H).astype(int)]
+displaced = displaceEdgeLoops(loopBlock, lightnessRows, DISPLACEMENT_DEPTH)
+displacedEdgeLoops = [originalEdgeLoops[0]] + displaced.tolist() + [originalEdgeLoops[-1]]
 mesh.updateEdgeLoops(displacedEdgeLoops, displaceStart, displaceEnd)
 
 print "Calculating faces..."
@@ -580,15 +277,12 @@ mesh.processEdgeloops()
 data = [
     {
         "name": "Cup",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range((VERTICES_PER_EDGE_LOOP/4)**2)
+        "location": CENTER
     }
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
-import colorsys
 import json
 import math
-from PIL import Image
+import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from meshlib.imagemap import ImageMap
+
 # data config
 OUTPUT_FILE = "letterTest.json"
 PRECISION = 5
@@ -14,9 +16,8 @@ HEIGHT = 5.0
 DEPTH = .2
 RESOLUTION = 0.025
 
-im = Image.open("letterTest.png")
-imgData = list(im.getdata())
-imgW, imgH = im.size
+imgMap = ImageMap("letterTest.png")
+imgW, imgH = imgMap.width, imgMap.height
 
 matrix = []
 verts = []
@@ -34,10 +35,7 @@ for row in range(rows+1):
         if 0 < col < cols and 0 < row < rows:
             ix = int(1.0 * col / cols * imgW)
             iy = int(1.0 * row / rows * imgH)
-            i = int(iy * imgW + ix)
-            rgb = imgData[i]
-            hls = colorsys.rgb_to_hls(rgb[0]/255.0, rgb[1]/255.0, rgb[2]/255.0)
-            z = -DEPTH * (1.0 - hls[1])
+            z = -DEPTH * (1.0 - imgMap.lightness[iy, ix])
         verts.append((x,y,z))
 
 # generate faces
@@ -0,0 +1,51 @@
+# Exports mesh.bin files straight to a printable format without Blender, e.g.
+#   python export.py pot/mesh.bin pot.stl
+#   python export.py pot/mesh.bin pot_lid/mesh_actual.bin pot_with_lid.obj
+#   python export.py -subd 4 pot/mesh.bin pot.stl
+#   python export.py -subd 1 -dec 0.25 bowl/mesh.bin bowl.stl
+# The format comes from the output's extension: .stl, .ply or .obj
+# Decimating takes roughly 30s and 700MB per million triangles, so bigger meshes than
+# DECIMATE_MAX_TRIANGLES (e.g. the cup at -subd 2) are refused; subdivide less instead
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from meshlib.decimate import decimate
+from meshlib.export import exportMesh, mergeObjects, triangulate
+from meshlib.meshfile import readMeshFile
+from meshlib.subdivide import subdivide
+
+parser = argparse.ArgumentParser()
+parser.add_argument('files', nargs='+', help="mesh.bin files followed by the output file")
+parser.add_argument('-ascii', dest="ASCII", action="store_true", help="Write ASCII instead of binary PLY")
+parser.add_argument('-tri', dest="TRIANGULATE", action="store_true", help="Triangulate quads in PLY and OBJ output (STL is always triangles)")
+parser.add_argument('-subd', dest="SUBDIVIDE", type=int, default=0, help="Catmull-Clark subdivision levels, like the subsurf levels in blend.py")
+parser.add_argument('-dec', dest="DECIMATE", type=float, default=0, help="Decimate to this ratio of the triangle count after subdividing, like the decimate ratio in blend.py")
+parser.add_argument('-faces', dest="FACES", type=int, default=0, help="Decimate to this many triangles instead of a ratio")
+args = parser.parse_args()
+
+DECIMATE_MAX_TRIANGLES = 6000000
+
+if len(args.files) < 2:
+    parser.error("Need at least one mesh file and an output file")
+
+inputFiles = args.files[:-1]
+outputFile = args.files[-1]
+
+objects = []
+for filename in inputFiles:
+    objects += readMeshFile(filename)
+
+verts, faces = mergeObjects(objects)
+if args.SUBDIVIDE > 0:
+    verts, faces = subdivide(verts, faces, args.SUBDIVIDE)
+if args.DECIMATE > 0 or args.FACES > 0:
+    triangleCount = len(triangulate(faces))
+    if triangleCount > DECIMATE_MAX_TRIANGLES:
+        parser.error("%s triangles is too many to decimate (the limit is %s); use a lower -subd" % (triangleCount, DECIMATE_MAX_TRIANGLES))
+    verts, faces = decimate(verts, faces, args.DECIMATE, args.FACES if args.FACES > 0 else None)
+name = objects[0]["name"] if len(objects) == 1 else os.path.splitext(os.path.basename(outputFile))[0]
+exportMesh(outputFile, verts, faces, name, binary=(not args.ASCII), triangulated=args.TRIANGULATE)
+print("Wrote %s vertices and %s faces to %s" % (len(verts), len(faces), outputFile))
@@ -0,0 +1 @@
+from meshlib.mesh import Mesh
@@ -0,0 +1,41 @@
+import numpy as np
+
+# reverse winding the way Blender's polygon.flip() does, keeping the first vertex in place
+FLIP_QUAD = [0, 3, 2, 1]
+FLIP_TRIANGLE = [0, 2, 1, 3]
+
+def flipWinding(faces, flipFaces):
+    """ Copy of an (M, 4) face array with the listed faces' winding reversed """
+    faces = np.array(faces, dtype=np.int32).reshape(-1, 4)
+    flipFaces = np.asarray(flipFaces, dtype=np.intp)
+    if len(flipFaces) <= 0:
+        return faces
+    flipped = faces[flipFaces]
+    triangles = flipped[:, 3] < 0
+    flipped[~triangles] = flipped[~triangles][:, FLIP_QUAD]
+    flipped[triangles] = flipped[triangles][:, FLIP_TRIANGLE]
+    faces[flipFaces] = flipped
+    return faces
+
+def meshArrays(verts, faces, flipFaces=[]):
+    """ Flat arrays for Blender's vertices/loops/polygons foreach_set:
+        co (float32), loop vertex indices, polygon loop starts and totals (int32)
+    """
+    co = np.ascontiguousarray(verts, dtype=np.float32).reshape(-1)
+    faces = flipWinding(faces, flipFaces)
+    used = faces >= 0
+    loopTotals = used.sum(axis=1).astype(np.int32)
+    loopStarts = (np.cumsum(loopTotals) - loopTotals).astype(np.int32)
+    loopVerts = np.ascontiguousarray(faces[used], dtype=np.int32)
+    return co, loopVerts, loopStarts, loopTotals
+
+def fillMesh(mesh, verts, faces, flipFaces=[]):
+    """ Fill an empty bpy mesh from vertex and face arrays in bulk """
+    co, loopVerts, loopStarts, loopTotals = meshArrays(verts, faces, flipFaces)
+    mesh.vertices.add(len(co) // 3)
+    mesh.loops.add(len(loopVerts))
+    mesh.polygons.add(len(loopStarts))
+    mesh.vertices.foreach_set("co", co)
+    mesh.loops.foreach_set("vertex_index", loopVerts)
+    mesh.polygons.foreach_set("loop_start", loopStarts)
+    mesh.polygons.foreach_set("loop_total", loopTotals)
@@ -0,0 +1,286 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from meshlib.export import triangulate
+
+# boundary edges get a plane perpendicular to their face with this much extra weight so open edges keep their outline
+BOUNDARY_WEIGHT = 1000.0
+
+# quadric coefficients are stored as the upper triangle of the symmetric 4x4 matrix:
+# aa ab ac ad bb bc bd cc cd dd
+UPPER = (np.array([0, 0, 0, 0, 1, 1, 1, 2, 2, 3]), np.array([0, 1, 2, 3, 1, 2, 3, 2, 3, 3]))
+
+# rounds of edge selection per pass; more rounds collapse more edges per pass
+SELECTION_ROUNDS = 8
+# a pass considers at least 1/SELECTION_WINDOW of the collapsible edges, cheapest first
+SELECTION_WINDOW = 8
+# cost bands a pass's edges are split into; edges in the same band are taken in no particular order
+SELECTION_BANDS = 4
+# rank of edges left out of a pass
+NOT_COLLAPSIBLE = np.iinfo(np.int64).max
+
+def planeQuadrics(planes, weights):
+    """ Weighted (N, 10) quadrics for (N, 4) planes ax + by + cz + d = 0 """
+    return planes[:, UPPER[0]] * planes[:, UPPER[1]] * weights[:, np.newaxis]
+
+def vertexQuadrics(verts, triangles):
+    """ Sum of the area-weighted plane quadrics around each vertex, plus boundary constraint planes """
+    p0, p1, p2 = verts[triangles[:, 0]], verts[triangles[:, 1]], verts[triangles[:, 2]]
+    normals = np.cross(p1 - p0, p2 - p0)
+    lengths = np.sqrt((normals * normals).sum(axis=1))
+    valid = lengths > 0
+    normals[valid] /= lengths[valid][:, np.newaxis]
+    planes = np.column_stack((normals, -(normals * p0).sum(axis=1)))
+    faceQuadrics = planeQuadrics(planes, lengths * 0.5)
+
+    vertCount = len(verts)
+    corners = triangles.reshape(-1)
+    quadrics = np.column_stack([np.bincount(corners, np.repeat(faceQuadrics[:, k], 3), minlength=vertCount) for k in range(10)])
+
+    # edges used by only one triangle: a plane through the edge, perpendicular to the triangle
+    a = triangles.reshape(-1)
+    b = triangles[:, [1, 2, 0]].reshape(-1)
+    faceIds = np.repeat(np.arange(len(triangles)), 3)
+    keys, inverse, counts = np.unique(np.minimum(a, b).astype(np.int64) * vertCount + np.maximum(a, b), return_inverse=True, return_counts=True)
+    boundary = counts[inverse] == 1
+    if np.any(boundary):
+        a, b, faceIds = a[boundary], b[boundary], faceIds[boundary]
+        edges = verts[b] - verts[a]
+        edgeNormals = np.cross(edges, normals[faceIds])
+        edgeLengths = np.sqrt((edgeNormals * edgeNormals).sum(axis=1))
+        valid = edgeLengths > 0
+        edgeNormals[valid] /= edgeLengths[valid][:, np.newaxis]
+        edgePlanes = np.column_stack((edgeNormals, -(edgeNormals * verts[a]).sum(axis=1)))
+        edgeQuadrics = planeQuadrics(edgePlanes, BOUNDARY_WEIGHT * (edges * edges).sum(axis=1))
+        for ends in (a, b):
+            quadrics += np.column_stack([np.bincount(ends, edgeQuadrics[:, k], minlength=vertCount) for k in range(10)])
+
+    return quadrics
+
+def quadricError(q, x, y, z):
+    return (q[0]*x*x + 2*q[1]*x*y + 2*q[2]*x*z + 2*q[3]*x + q[4]*y*y + 2*q[5]*y*z + 2*q[6]*y
+            + q[7]*z*z + 2*q[8]*z + q[9])
+
+def collapseTargets(q, p1, p2):
+    """ Positions minimizing (E, 10) quadrics for edges with (E, 3) end points, falling back to the
+        best of the ends and midpoint when a quadric is close to singular; returns (errors, positions)
+    """
+    aa, ab, ac, ad, bb, bc, bd, cc, cd, dd = q.T
+    det = aa*(bb*cc - bc*bc) - ab*(ab*cc - bc*ac) + ac*(ab*bc - bb*ac)
+    scale = aa + bb + cc
+    solvable = np.abs(det) > 1e-9 * scale * scale * scale
+    safeDet = np.where(solvable, det, 1.0)
+    r0, r1, r2 = -ad, -bd, -cd
+    optimal = np.column_stack((
+        (r0*(bb*cc - bc*bc) - ab*(r1*cc - bc*r2) + ac*(r1*bc - bb*r2)) / safeDet,
+        (aa*(r1*cc - bc*r2) - r0*(ab*cc - bc*ac) + ac*(ab*r2 - r1*ac)) / safeDet,
+        (aa*(bb*r2 - r1*bc) - ab*(ab*r2 - r1*ac) + r0*(ab*bc - bb*ac)) / safeDet
+    ))
+
+    # where q is close to singular, the best of the first end, second end and midpoint, keeping the first lowest
+    candidates = [p1, p2, (p1 + p2) * 0.5]
+    errors = np.column_stack([np.maximum(quadricError(q.T, p[:, 0], p[:, 1], p[:, 2]), 0.0) for p in candidates])
+    best = np.argmin(errors, axis=1)
+    targets = np.choose(best[:, np.newaxis], candidates)
+    errors = errors[np.arange(len(best)), best]
+    targets[solvable] = optimal[solvable]
+    errors[solvable] = np.maximum(quadricError(q[solvable].T, *optimal[solvable].T), 0.0)
+    return errors, targets
+
+def faceNormals(p0, p1, p2):
+    return np.cross(p1 - p0, p2 - p0)
+
+def concatenatedRanges(starts, counts):
+    """ starts[i], starts[i]+1, ... starts[i]+counts[i]-1 for every i, concatenated """
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.repeat(np.asarray(starts, dtype=np.int64) - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(counts.sum(), dtype=np.int64)
+
+def groupMin(starts, values, fill):
+    """ Minimum of each CSR group of values (group i is values[starts[i]:starts[i+1]]); `fill` for empty groups """
+    result = np.full(len(starts)-1, fill, dtype=values.dtype)
+    nonEmpty = np.flatnonzero(starts[1:] > starts[:-1])
+    if len(nonEmpty) > 0:
+        result[nonEmpty] = np.minimum.reduceat(values, starts[nonEmpty])
+    return result
+
+def groupOrder(groups, count):
+    """ Stable order of the items sorted by group (ints below count), and the CSR starts of each group;
+        scipy's COO to CSR conversion is a counting sort, so this is linear
+    """
+    matrix = coo_matrix((np.ones(len(groups), dtype=np.int8), (groups, np.arange(len(groups)))), shape=(count, max(len(groups), 1))).tocsr()
+    return matrix.indices.astype(np.int64), matrix.indptr.astype(np.int64)
+
+def meshEdges(triangles, vertCount):
+    """ Sorted unique edges (u < v) of the triangles, with how many triangles use each """
+    a = triangles.reshape(-1)
+    b = triangles[:, [1, 2, 0]].reshape(-1)
+    matrix = coo_matrix((np.ones(len(a), dtype=np.int32), (np.minimum(a, b), np.maximum(a, b))), shape=(vertCount, vertCount)).tocsr()
+    u = np.repeat(np.arange(vertCount, dtype=np.int64), np.diff(matrix.indptr))
+    return u, matrix.indices.astype(np.int64), matrix.data
+
+def sortedContains(keys, values):
+    """ Whether each of the sorted keys is one of the values """
+    contains = np.zeros(len(keys), dtype=bool)
+    if len(keys) > 0 and len(values) > 0:
+        found = np.minimum(np.searchsorted(keys, values), len(keys)-1)
+        contains[found[keys[found] == values]] = True
+    return contains
+
+def independentEdges(u, v, rank, vertCount, rounds=SELECTION_ROUNDS):
+    """ Edges taken greedily in rank order (rank NOT_COLLAPSIBLE for edges that can't be collapsed),
+        skipping any with an end within one edge of an end of one already taken. Collapses of
+        these edges don't touch the same triangles, so they can all be done at once. Each round
+        takes every edge that ranks lowest around its ends' one-rings; `rounds` caps how many
+        rounds are run. Returns the edge indices and each vertex's neighbours as CSR (starts, neighbours)
+    """
+    edgeCount = len(u)
+    order, starts = groupOrder(np.concatenate((u, v)), vertCount)
+    neighbours = np.concatenate((v, u))[order]
+    directedEdges = np.concatenate((np.arange(edgeCount), np.arange(edgeCount)))[order]
+
+    rank = rank.copy()
+    selected = []
+    for i in range(rounds):
+        available = rank < NOT_COLLAPSIBLE
+        if not np.any(available):
+            break
+        vertexMin = groupMin(starts, rank[directedEdges], NOT_COLLAPSIBLE)
+        ringMin = np.minimum(vertexMin, groupMin(starts, vertexMin[neighbours], NOT_COLLAPSIBLE))
+        taken = np.flatnonzero(available & (rank == np.minimum(ringMin[u], ringMin[v])))
+        selected.append(taken)
+
+        # block every edge with an end within one edge of a taken edge's ends
+        blocked = np.zeros(vertCount, dtype=bool)
+        blocked[u[taken]] = True
+        blocked[v[taken]] = True
+        blocked[neighbours[np.repeat(blocked, np.diff(starts))]] = True
+        rank[blocked[u] | blocked[v]] = NOT_COLLAPSIBLE
+    return np.concatenate(selected) if len(selected) > 0 else np.zeros(0, dtype=np.int64), starts, neighbours
+
+def decimate(verts, faces, ratio=None, faceCount=None):
+    """ Reduce a mesh to `faceCount` triangles (or `ratio` of its triangulated face count)
+        by collapsing edges in passes, all with array operations. Each pass takes a window of the
+        cheapest edges by quadric error, splits it into SELECTION_BANDS cost bands, and ranks the
+        edges band by band, at random within a band. It then collapses an independent set of them
+        (no two within one edge of each other), picked greedily in that rank order, cheapest first
+        until the target is reached. So the collapse order only roughly follows quadric error; it
+        is not a strict cheapest-first queue. The random ranking uses a fixed seed, so the same
+        mesh always decimates the same way. Collapses that would fold a triangle over or pinch the
+        surface are skipped, so the result can end up above the target.
+        Returns verts and (M, 4) faces padded with -1
+    """
+    verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+    triangles = triangulate(np.asarray(faces).reshape(-1, 4)).astype(np.int64)
+    if faceCount is None:
+        faceCount = int(round(len(triangles) * (1.0 if ratio is None else ratio)))
+
+    vertCount = len(verts)
+    quadrics = vertexQuadrics(verts, triangles)
+    positions = verts.copy()
+    # a fixed seed, so decimating the same mesh always gives the same result
+    random = np.random.RandomState(0)
+    # keys (min * vertCount + max) of edges that failed a check, until something near them changes
+    rejected = np.zeros(0, dtype=np.int64)
+    # costs from the last pass, by key; only edges with an end that was collapsed into need new ones
+    lastKeys = np.zeros(0, dtype=np.int64)
+    changed = np.zeros(vertCount, dtype=bool)
+
+    while len(triangles) > faceCount:
+        # edges with the number of triangles using each; more than two is non-manifold and left alone
+        u, v, shared = meshEdges(triangles, vertCount)
+        keys = u * vertCount + v
+        candidate = (shared <= 2) & ~sortedContains(keys, rejected)
+        if not np.any(candidate):
+            break
+
+        if len(lastKeys) > 0:
+            found = np.minimum(np.searchsorted(lastKeys, keys), len(lastKeys)-1)
+            errors, targets = lastErrors[found], lastTargets[found]
+            stale = np.flatnonzero((lastKeys[found] != keys) | changed[u] | changed[v])
+        else:
+            errors, targets = np.zeros(len(keys)), np.zeros((len(keys), 3))
+            stale = np.arange(len(keys))
+        su, sv = u[stale], v[stale]
+        errors[stale], targets[stale] = collapseTargets(quadrics[su] + quadrics[sv], positions[su], positions[sv])
+        lastKeys, lastErrors, lastTargets = keys, errors, targets
+        changed[:] = False
+
+        # only the cheapest edges that could still be needed, or at least a fraction of them all,
+        # are considered in a pass, so the order stays close to collapsing one edge at a time
+        order = np.flatnonzero(candidate)
+        size = max((len(triangles) - faceCount + 1) // 2, len(order) // SELECTION_WINDOW, 1)
+        if size < len(order):
+            order = order[errors[order] <= np.partition(errors[order], size-1)[size-1]]
+
+        # edges are ranked by cost band, then at random within a band, so that independent edges
+        # are found in a few rounds even where the cost changes smoothly across the surface
+        windowErrors = errors[order]
+        bounds = np.partition(windowErrors, [len(order) * i // SELECTION_BANDS for i in range(1, SELECTION_BANDS)])
+        bounds = bounds[[len(order) * i // SELECTION_BANDS for i in range(1, SELECTION_BANDS)]]
+        rank = np.full(len(keys), NOT_COLLAPSIBLE, dtype=np.int64)
+        rank[order] = np.searchsorted(bounds, windowErrors, side="right") * len(order) + random.permutation(len(order))
+        edges, neighbourStarts, neighbours = independentEdges(u, v, rank, vertCount)
+        eu, ev = u[edges], v[edges]
+
+        # link condition: the only vertices neighbouring both ends are the ones across the shared faces
+        pairs = concatenatedRanges(neighbourStarts[eu], neighbourStarts[eu+1] - neighbourStarts[eu])
+        pairEdge = np.repeat(np.arange(len(edges)), neighbourStarts[eu+1] - neighbourStarts[eu])
+        w = neighbours[pairs]
+        pairKeys = np.minimum(ev[pairEdge], w) * vertCount + np.maximum(ev[pairEdge], w)
+        found = np.minimum(np.searchsorted(keys, pairKeys), len(keys)-1)
+        common = np.bincount(pairEdge, (keys[found] == pairKeys) & (w != ev[pairEdge]), minlength=len(edges))
+        valid = common == shared[edges]
+
+        # reject collapses that flip a remaining triangle
+        corners = triangles.reshape(-1)
+        faceOrder, faceStarts = groupOrder(corners, vertCount)
+        ends = np.concatenate((eu, ev))
+        endEdge = np.concatenate((np.arange(len(edges)), np.arange(len(edges))))
+        counts = faceStarts[ends+1] - faceStarts[ends]
+        pairFaces = faceOrder[concatenatedRanges(faceStarts[ends], counts)] // 3
+        pairEdge = np.repeat(endEdge, counts)
+        tris = triangles[pairFaces]
+        moved = (tris == eu[pairEdge][:, np.newaxis]) | (tris == ev[pairEdge][:, np.newaxis])
+        kept = moved.sum(axis=1) == 1
+        before = positions[tris[kept]]
+        after = np.where(moved[kept][:, :, np.newaxis], targets[edges][pairEdge[kept]][:, np.newaxis, :], before)
+        normalsBefore = faceNormals(before[:, 0], before[:, 1], before[:, 2])
+        normalsAfter = faceNormals(after[:, 0], after[:, 1], after[:, 2])
+        flips = np.any(normalsBefore != 0, axis=1) & ((normalsBefore * normalsAfter).sum(axis=1) <= 0)
+        valid &= np.bincount(pairEdge[kept], flips, minlength=len(edges)) == 0
+
+        rejected = np.concatenate((rejected, keys[edges[~valid]]))
+        collapse = np.flatnonzero(valid)
+        if len(collapse) <= 0:
+            continue
+
+        # cheapest first, stopping once the target is reached
+        collapse = collapse[np.argsort(errors[edges[collapse]], kind="mergesort")]
+        removed = np.cumsum(shared[edges[collapse]])
+        collapse = collapse[:np.searchsorted(removed, len(triangles) - faceCount) + 1]
+
+        # collapse each v into its u
+        cu, cv = eu[collapse], ev[collapse]
+        positions[cu] = targets[edges[collapse]]
+        quadrics[cu] += quadrics[cv]
+        changed[cu] = True
+        touched = np.zeros(vertCount, dtype=bool)
+        collapsing = np.zeros(len(edges), dtype=bool)
+        collapsing[collapse] = True
+        touched[tris[collapsing[pairEdge]].reshape(-1)] = True
+        remap = np.arange(vertCount)
+        remap[cv] = cu
+        triangles = remap[triangles]
+        triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])]
+
+        # edges near a collapse get another chance
+        rejected = rejected[~(touched[rejected // vertCount] | touched[rejected % vertCount])]
+
+    # drop unused vertices, keeping the original order
+    used = np.zeros(vertCount, dtype=bool)
+    used[triangles.reshape(-1)] = True
+    remap = np.cumsum(used) - 1
+    newFaces = np.full((len(triangles), 4), -1, dtype=np.int32)
+    newFaces[:, :3] = remap[triangles]
+    return positions[used], newFaces
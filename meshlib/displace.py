@@ -0,0 +1,99 @@
+import numpy as np
+
+# HLS lightness (as in colorsys.rgb_to_hls) of an array of 0-255 RGB values
+def lightness(rgb):
+    rgb = np.asarray(rgb, dtype=np.float64)[..., :3] / 255.0
+    return (rgb.max(axis=-1) + rgb.min(axis=-1)) * 0.5
+
+# round half away from zero like python 2's round()
+def roundIndex(values):
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.intp)
+
+def displaceAlongNormals(loops, loopsBefore, loopsAfter, amounts, direction="out"):
+    """ Displace a block of closed edge loops along their surface normals
+
+        loops, loopsBefore, loopsAfter: (L, V, 3) arrays where loopsBefore[k] and
+            loopsAfter[k] are the neighbours of loops[k]
+        amounts: (L, V) displacement per vertex
+        returns the displaced (L, V, 3) block
+    """
+    loops = np.asarray(loops, dtype=np.float64)
+    loopsBefore = np.asarray(loopsBefore, dtype=np.float64)
+    loopsAfter = np.asarray(loopsAfter, dtype=np.float64)
+
+    p0 = loops
+    p1 = np.roll(loopsBefore, 1, axis=1)
+    p2 = np.roll(loopsBefore, -1, axis=1)
+    p3 = loopsAfter
+
+    # normalize Z
+    deltaZBefore = p1[..., 2] - p0[..., 2]
+    deltaZAfter = p3[..., 2] - p0[..., 2]
+    p1 = np.dstack((p1[..., 0], p1[..., 1], deltaZBefore))
+    p2 = np.dstack((p2[..., 0], p2[..., 1], deltaZBefore))
+    p3 = np.dstack((p3[..., 0], p3[..., 1], deltaZAfter))
+
+    # calculate normal of triangle made from points above, below, and adjacent
+    # https://stackoverflow.com/questions/19350792/calculate-normal-of-a-single-triangle-in-3d-space
+    u = p3 - p1
+    v = p2 - p1
+    # if we want normals to go towards center
+    if direction == "in":
+        u, v = v, u
+    n = np.cross(u, v)
+
+    # calculate distance bewteen point and normal
+    # https://math.stackexchange.com/questions/105400/linear-interpolation-in-3-dimensions
+    flat = np.dstack((p0[..., 0], p0[..., 1], np.zeros(p0.shape[:2])))
+    dist = n - flat
+    ndist = np.sqrt((dist * dist).sum(axis=-1))
+    displaced = flat - (np.asarray(amounts, dtype=np.float64) / ndist)[..., np.newaxis] * dist
+    displaced[..., 2] += p0[..., 2]
+    return displaced
+
+# sample an (H, W, C) image at pixel coordinates x, y; returns (N, C) floats
+def sampleImage(pixels, x, y, bilinear=False):
+    h, w = pixels.shape[:2]
+    flat = pixels.reshape(h * w, -1)
+
+    if not bilinear:
+        return flat[roundIndex(y) * w + roundIndex(x)].astype(np.float64)
+
+    x = np.clip(x, 0, w-1)
+    y = np.clip(y, 0, h-1)
+    x0 = np.minimum(np.floor(x).astype(np.intp), w-2)
+    y0 = np.minimum(np.floor(y).astype(np.intp), h-2)
+    tx = (x - x0)[:, np.newaxis]
+    ty = (y - y0)[:, np.newaxis]
+    i = y0 * w + x0
+    top = flat[i] * (1.0 - tx) + flat[i+1] * tx
+    bottom = flat[i+w] * (1.0 - tx) + flat[i+w+1] * tx
+    return top * (1.0 - ty) + bottom * ty
+
+def displaceWithImage(verts, pixels, bounds, displacement, scale, translate, minZ=0, bilinear=False):
+    """ Offset (N, 3) vertices by an RGB image map laid over bounds
+
+        Red, green and blue move vertices along x, y and z by the amounts in
+        displacement; z is only moved for vertices above minZ and never below it
+    """
+    verts = np.array(verts, dtype=np.float64)
+    h, w = pixels.shape[:2]
+    dx, dy, dz = displacement
+
+    nx = (verts[:, 0] - bounds[0][0]) / (bounds[1][0] - bounds[0][0])
+    ny = (verts[:, 1] - bounds[0][1]) / (bounds[1][1] - bounds[0][1])
+    px = nx * w * scale - translate[0]
+    py = ny * h * scale - translate[1]
+    ix = roundIndex(px)
+    inside = (0 <= ix) & (ix < w) & (ix < h)
+    if not inside.any():
+        return verts
+
+    rgb = sampleImage(pixels, px[inside], py[inside], bilinear)[:, :3] / 255.0
+    displaced = verts[inside]
+    displaced[:, 0] += dx * rgb[:, 0]
+    displaced[:, 1] += dy * rgb[:, 1]
+    above = displaced[:, 2] > minZ
+    displaced[above, 2] = np.maximum(displaced[above, 2] + dz * rgb[above, 2], minZ)
+    verts[inside] = displaced
+    return verts
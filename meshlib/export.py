@@ -0,0 +1,152 @@
+import numpy as np
+import os
+
+# faces are written this many at a time so large meshes never need the whole output in memory
+CHUNK_SIZE = 65536
+
+STL_DTYPE = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("verts", "<f4", (3, 3)),
+    ("attributes", "<u2")
+])
+
+def faceSizes(faces):
+    return (np.asarray(faces) >= 0).sum(axis=1)
+
+def triangleCount(faces):
+    return int(np.sum(faceSizes(faces) - 2))
+
+def triangulate(faces):
+    """ Split (M, 4) faces into (T, 3) triangles in order; quad [a, b, c, d]
+        becomes [a, b, c] and [a, c, d]
+    """
+    faces = np.asarray(faces).reshape(-1, 4)
+    quads = faces[:, 3] >= 0
+    rows = np.repeat(np.arange(len(faces)), quads + 1)
+    second = np.zeros(len(rows), dtype=bool)
+    second[1:] = rows[1:] == rows[:-1]
+    triangles = faces[rows, :3].copy()
+    triangles[second, 1:] = faces[rows[second], 2:]
+    return triangles
+
+def faceChunks(faces, chunkSize=CHUNK_SIZE):
+    faces = np.asarray(faces).reshape(-1, 4)
+    for start in range(0, len(faces), chunkSize):
+        yield faces[start:start+chunkSize]
+
+def sizeRuns(faces):
+    """ Split faces into runs that have the same number of vertices """
+    sizes = faceSizes(faces)
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(sizes)) + 1, [len(faces)]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield faces[start:end, :sizes[start]]
+
+def writeSTL(filename, verts, faces, name="", chunkSize=CHUNK_SIZE):
+    """ Write a binary STL, triangulating quads """
+    verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+    header = np.zeros(80, dtype=np.uint8)
+    name = name.encode("utf-8")[:80]
+    header[:len(name)] = np.frombuffer(name, dtype=np.uint8)
+
+    with open(filename, "wb") as f:
+        f.write(header.tobytes())
+        f.write(np.array([triangleCount(faces)], dtype="<u4").tobytes())
+        for chunk in faceChunks(faces, chunkSize):
+            triangles = verts[triangulate(chunk)]
+            normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            lengths = np.sqrt((normals * normals).sum(axis=1))
+            lengths[lengths <= 0] = 1.0
+            records = np.zeros(len(triangles), dtype=STL_DTYPE)
+            records["normal"] = normals / lengths[:, np.newaxis]
+            records["verts"] = triangles
+            f.write(records.tobytes())
+
+def writePLY(filename, verts, faces, binary=True, triangulated=False, chunkSize=CHUNK_SIZE):
+    """ Write a PLY with float vertices and int face lists; binary is little-endian """
+    verts = np.asarray(verts).reshape(-1, 3)
+    faces = np.asarray(faces).reshape(-1, 4)
+    faceCount = triangleCount(faces) if triangulated else len(faces)
+    header = "\n".join([
+        "ply",
+        "format %s 1.0" % ("binary_little_endian" if binary else "ascii"),
+        "element vertex %s" % len(verts),
+        "property float x",
+        "property float y",
+        "property float z",
+        "element face %s" % faceCount,
+        "property list uchar int vertex_indices",
+        "end_header"
+    ]) + "\n"
+
+    with open(filename, "wb") as f:
+        f.write(header.encode("ascii"))
+
+        for start in range(0, len(verts), chunkSize):
+            chunk = verts[start:start+chunkSize]
+            if binary:
+                f.write(np.ascontiguousarray(chunk, dtype="<f4").tobytes())
+            else:
+                np.savetxt(f, chunk, fmt="%.6f")
+
+        for chunk in faceChunks(faces, chunkSize):
+            if triangulated:
+                chunk = np.pad(triangulate(chunk), ((0, 0), (0, 1)), "constant", constant_values=-1)
+            if not binary:
+                for run in sizeRuns(chunk):
+                    np.savetxt(f, run, fmt=" ".join(["%s" % run.shape[1]] + ["%d"] * run.shape[1]))
+                continue
+            # each record is a uchar count followed by that many int32 indices
+            sizes = faceSizes(chunk)
+            recordSizes = 1 + 4 * sizes
+            countOffsets = np.cumsum(recordSizes) - recordSizes
+            record = np.zeros(int(recordSizes.sum()), dtype=np.uint8)
+            isCount = np.zeros(len(record), dtype=bool)
+            isCount[countOffsets] = True
+            record[countOffsets] = sizes
+            indexBytes = np.ascontiguousarray(chunk, dtype="<i4").view(np.uint8).reshape(-1, 16)
+            record[~isCount] = indexBytes[np.arange(16)[np.newaxis, :] < 4 * sizes[:, np.newaxis]]
+            f.write(record.tobytes())
+
+def writeOBJ(filename, verts, faces, name="", triangulated=False, chunkSize=CHUNK_SIZE):
+    """ Write a Wavefront OBJ with 1-based face indices """
+    verts = np.asarray(verts).reshape(-1, 3)
+
+    with open(filename, "wb") as f:
+        if len(name) > 0:
+            f.write(("o %s\n" % name).encode("utf-8"))
+
+        for start in range(0, len(verts), chunkSize):
+            np.savetxt(f, verts[start:start+chunkSize], fmt="v %.6f %.6f %.6f")
+
+        for chunk in faceChunks(faces, chunkSize):
+            if triangulated:
+                np.savetxt(f, triangulate(chunk) + 1, fmt="f %d %d %d")
+                continue
+            for run in sizeRuns(chunk):
+                np.savetxt(f, run + 1, fmt="f" + " %d" * run.shape[1])
+
+def exportMesh(filename, verts, faces, name="", binary=True, triangulated=False):
+    """ Write a mesh in the format given by the filename's extension: .stl, .ply or .obj """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".stl":
+        writeSTL(filename, verts, faces, name)
+    elif ext == ".ply":
+        writePLY(filename, verts, faces, binary, triangulated)
+    elif ext == ".obj":
+        writeOBJ(filename, verts, faces, name, triangulated)
+    else:
+        raise ValueError("Unknown export format: %s" % filename)
+
+def mergeObjects(objects):
+    """ Combine mesh file objects into one set of verts and faces, moving each to its location """
+    verts = []
+    faces = []
+    offset = 0
+    for o in objects:
+        v = np.asarray(o["verts"], dtype=np.float64) + np.asarray(o.get("location", (0, 0, 0)), dtype=np.float64)
+        f = np.array(o["faces"], dtype=np.int32).reshape(-1, 4)
+        f[f >= 0] += offset
+        verts.append(v)
+        faces.append(f)
+        offset += len(v)
+    return np.concatenate(verts).reshape(-1, 3), np.concatenate(faces).reshape(-1, 4)
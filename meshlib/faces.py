@@ -0,0 +1,123 @@
+import numpy as np
+
+# quad strip joining `loopCount` consecutive loops of `loopLen` vertices each
+# returns an ((loopCount-1) * loopLen, 4) array of vertex indices
+def quadStrip(loopLen, indexOffset=0, loopCount=2):
+    i = np.arange(loopLen, dtype=np.int32)
+    ring = np.column_stack((i, np.roll(i, -1)))
+    ring = np.column_stack((ring, ring[:, ::-1] + loopLen))
+    starts = np.arange(loopCount-1, dtype=np.int32) * loopLen + indexOffset
+    faces = ring[np.newaxis, :, :] + starts[:, np.newaxis, np.newaxis]
+    return faces.reshape(-1, 4)
+
+# group consecutive loops of equal length into runs: (first loop, last loop)
+def equalLengthRuns(lengths):
+    runs = []
+    start = 0
+    for i in range(1, len(lengths)+1):
+        if i >= len(lengths) or lengths[i] != lengths[i-1]:
+            runs.append((start, i-1))
+            start = i
+    return runs
+
+# faces between a loop and a smaller loop, with the corner faces spread evenly along each side
+def transitionLoop(bigger, smaller, biggerOffset, smallerOffset):
+    faces = []
+    edgesPerSide = bigger // 4
+
+    for i in range(bigger-4):
+        offset = abs(i-1) // (edgesPerSide-1)
+        v1 = i + offset + biggerOffset
+        v2 = v1 + 1
+        v3 = i + offset - offset * 2 + smallerOffset
+        v4 = v3 - 1
+
+        # special case for first
+        if i==0:
+            v1 = biggerOffset
+            v2 = v1 + 1
+            v3 = smallerOffset
+            v4 = bigger - 1 + biggerOffset
+
+        # special case for reach corner face
+        elif i % (edgesPerSide-1) == 0:
+            v3 = v2 + 1
+
+        # special case for last
+        elif i==(bigger-5):
+            v3 = smallerOffset
+
+        faces.append((v1, v2, v3, v4))
+    return faces
+
+# faces between a loop and a smaller loop, with corner faces at fixed positions
+def cornerTransitionLoop(bigger, smaller, biggerOffset, smallerOffset, corners):
+    faces = []
+    offsetBigger = 0
+    offsetSmaller = 0
+
+    for i in range(bigger-4):
+        v1 = i + offsetBigger + biggerOffset
+        v2 = v1 + 1
+        v3 = i + offsetSmaller + smallerOffset
+        v4 = v3 - 1
+
+        # special case for first
+        if i==0:
+            v4 = bigger - 1 + biggerOffset
+
+        # special case for reach corner face
+        elif i in corners:
+            v3 = v2 + 1
+            offsetBigger += 1
+            offsetSmaller -= 1
+
+        # special case for last
+        elif i==(bigger-5):
+            v3 = smallerOffset
+
+        faces.append((v1, v2, v3, v4))
+    return faces
+
+# templates keyed by (bigger, smaller, corners): (indices, fromBigger)
+transitionTemplates = {}
+
+def transitionTemplate(bigger, smaller, corners=None):
+    key = (bigger, smaller, corners if corners is None else tuple(corners))
+    if key not in transitionTemplates:
+        if corners is None:
+            build = lambda bo, so: transitionLoop(bigger, smaller, bo, so)
+        else:
+            build = lambda bo, so: cornerTransitionLoop(bigger, smaller, bo, so, corners)
+        # every index is relative to exactly one of the two loops, so building
+        # once with both offsets at zero and once with the bigger offset at one
+        # tells us which loop each index belongs to
+        indices = np.array(build(0, 0), dtype=np.int32).reshape(-1, 4)
+        fromBigger = np.array(build(1, 0), dtype=np.int32).reshape(-1, 4) - indices
+        indices.setflags(write=False)
+        fromBigger = fromBigger.astype(bool)
+        fromBigger.setflags(write=False)
+        transitionTemplates[key] = (indices, fromBigger)
+    return transitionTemplates[key]
+
+# faces joining two loops of different lengths
+def transitionFaces(bigger, smaller, biggerOffset, smallerOffset, corners=None):
+    indices, fromBigger = transitionTemplate(bigger, smaller, corners)
+    return indices + np.where(fromBigger, biggerOffset, smallerOffset).astype(np.int32)
+
+# half-edges of (M, 4) faces padded with -1: each vertex to the next one around its face,
+# in face order, with the face each one belongs to
+def halfEdges(faces):
+    faces = np.asarray(faces).reshape(-1, 4)
+    sizes = (faces >= 0).sum(axis=1)
+    nextIndex = np.array([[1, 2, 3, 0], [1, 2, 0, 0], [1, 0, 0, 0]])
+    nextVerts = faces[np.arange(len(faces))[:, np.newaxis], nextIndex[4 - sizes]]
+    used = np.arange(4)[np.newaxis, :] < sizes[:, np.newaxis]
+    faceIds = np.repeat(np.arange(len(faces)), sizes)
+    return faces[used].astype(np.int64), nextVerts[used].astype(np.int64), faceIds
+
+# quads joining two openings of equal length, vertex i of one to vertex i of the other
+def bridgeFaces(openingA, openingB):
+    a = np.asarray(openingA, dtype=np.int32)
+    b = np.asarray(openingB, dtype=np.int32)
+    return np.column_stack((a, np.roll(a, -1), np.roll(b, -1), b))
@@ -0,0 +1,78 @@
+import numpy as np
+import os
+from PIL import Image
+
+from meshlib.displace import lightness
+
+class ImageMap(object):
+    """ Read-only pixels of an image map as an (H, W, C) array
+
+        The decoded pixels are saved to a raw .npy sidecar next to the image
+        and memory-mapped from there on later runs, as long as the sidecar is
+        newer than the image.
+    """
+
+    def __init__(self, filename, sidecar=True):
+        self.filename = filename
+        self.sidecarFile = os.path.splitext(filename)[0] + ".npy"
+        self.planes = {}
+
+        if sidecar and self.sidecarIsFresh():
+            pixels = np.load(self.sidecarFile, mmap_mode="r")
+        else:
+            pixels = np.array(Image.open(filename))
+            if pixels.ndim < 3:
+                pixels = pixels[:, :, np.newaxis]
+            if sidecar:
+                pixels = self.writeSidecar(pixels)
+        if pixels.flags.writeable:
+            pixels.setflags(write=False)
+
+        self.pixels = pixels
+        self.height, self.width = pixels.shape[:2]
+
+    def sidecarIsFresh(self):
+        if not os.path.isfile(self.sidecarFile):
+            return False
+        return os.path.getmtime(self.sidecarFile) >= os.path.getmtime(self.filename)
+
+    def writeSidecar(self, pixels):
+        try:
+            np.save(self.sidecarFile, pixels)
+        except (IOError, OSError):
+            return pixels
+        return np.load(self.sidecarFile, mmap_mode="r")
+
+    # a read-only float plane computed once from the pixels
+    def plane(self, name, compute):
+        if name not in self.planes:
+            plane = compute(self.pixels)
+            plane.setflags(write=False)
+            self.planes[name] = plane
+        return self.planes[name]
+
+    # 0-1 value of a single channel
+    def channel(self, index):
+        return self.plane("channel%s" % index, lambda p: p[:, :, index] / 255.0)
+
+    @property
+    def red(self):
+        return self.channel(0)
+
+    @property
+    def green(self):
+        return self.channel(1)
+
+    @property
+    def blue(self):
+        return self.channel(2)
+
+    # HLS lightness, as in colorsys.rgb_to_hls
+    @property
+    def lightness(self):
+        return self.plane("lightness", lambda p: lightness(p[:, :, :3]))
+
+    # ITU-R 601-2 luma, as in PIL's "L" mode
+    @property
+    def luminance(self):
+        return self.plane("luminance", lambda p: p[:, :, :3].dot([0.299, 0.587, 0.114]) / 255.0)
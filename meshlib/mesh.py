@@ -0,0 +1,262 @@
+import numpy as np
+
+# orient (scipy), decimate, export and subdivide are imported where they're used, so that
+# meshlib.blender and meshlib.meshfile stay importable from Blender's Python, which has numpy only
+from meshlib.faces import bridgeFaces, equalLengthRuns, quadStrip, transitionFaces
+from meshlib.openings import Openings, loopOpenings
+from meshlib.transform import applyTransform
+
+# placeholder for vertices that are cut out of a loop (marked False by the mesh scripts)
+HOLE = (np.nan, np.nan, np.nan)
+
+# grow a buffer so it can hold at least `needed` rows, doubling its capacity
+def growBuffer(buffer, count, needed):
+    capacity = len(buffer)
+    if needed <= capacity:
+        return buffer
+    capacity = max(needed, capacity * 2, 64)
+    grown = np.zeros((capacity, buffer.shape[1]), dtype=buffer.dtype)
+    grown[:count] = buffer[:count]
+    return grown
+
+# convert a list of (x, y, z) tuples to an (N, 3) array; False vertices become holes
+def loopArray(loop):
+    if isinstance(loop, np.ndarray):
+        return loop.reshape(-1, 3)
+    if any(v is False for v in loop):
+        loop = [HOLE if v is False else v for v in loop]
+    return np.array(loop, dtype=np.float64).reshape(-1, 3)
+
+# convert a list of faces to an (M, 4) array; triangles are padded with -1
+def faceArray(faces):
+    if isinstance(faces, np.ndarray) and faces.ndim == 2 and faces.shape[1] == 4:
+        return faces
+    faces = [tuple(f) + (-1,) * (4-len(f)) for f in faces]
+    return np.array(faces, dtype=np.int32).reshape(-1, 4)
+
+class Mesh(object):
+
+    # fixed corner positions for transitions between loops of different lengths;
+    # None spreads the corners evenly along each side
+    transitionCorners = None
+
+    def __init__(self):
+        self.vertBuffer = np.zeros((0, 3), dtype=np.float64)
+        self.faceBuffer = np.zeros((0, 4), dtype=np.int32)
+        self.vertCount = 0
+        self.faceCount = 0
+        self.edges = []
+        self.edgeLoops = []
+
+        self.edgeLoopOpenings = []
+        self.openings = Openings()
+
+    @property
+    def verts(self):
+        return self.vertBuffer[:self.vertCount]
+
+    @verts.setter
+    def verts(self, verts):
+        self.vertBuffer = loopArray(verts).astype(np.float64)
+        self.vertCount = len(self.vertBuffer)
+
+    @property
+    def faces(self):
+        return self.faceBuffer[:self.faceCount]
+
+    @faces.setter
+    def faces(self, faces):
+        self.faceBuffer = faceArray(faces).astype(np.int32)
+        self.faceCount = len(self.faceBuffer)
+
+    def addEdgeLoop(self, loop, loopOpenings=False):
+        self.edgeLoops.append(loop)
+        self.edgeLoopOpenings.append(loopOpenings)
+
+    def addEdgeLoops(self, loops):
+        for loop in loops:
+            self.addEdgeLoop(loop)
+
+    def addFace(self, face):
+        self.addFaces([face])
+
+    def addFaces(self, faces):
+        faces = faceArray(faces)
+        count = len(faces)
+        self.faceBuffer = growBuffer(self.faceBuffer, self.faceCount, self.faceCount + count)
+        self.faceBuffer[self.faceCount:self.faceCount+count] = faces
+        self.faceCount += count
+
+    # add vertices to the buffer and return the index of the first one
+    def appendVerts(self, verts):
+        verts = loopArray(verts)
+        index = self.vertCount
+        count = len(verts)
+        self.vertBuffer = growBuffer(self.vertBuffer, self.vertCount, self.vertCount + count)
+        self.vertBuffer[index:index+count] = verts
+        self.vertCount += count
+        return index
+
+    def addVertices(self, verts):
+        index = self.appendVerts(verts)
+        # return indices
+        return list(range(index, self.vertCount))
+
+    # faces as lists of vertex indices with triangle padding removed
+    def faceList(self):
+        return [[v for v in f if v >= 0] for f in self.faces.tolist()]
+
+    def getVertexCount(self):
+        return sum([len(l) for l in self.edgeLoops])
+
+    def joinEdgeLoops(self, loopA, loopB, indexOffset):
+        aLen = len(loopA)
+        bLen = len(loopB)
+
+        # number of vertices differ
+        if abs(bLen - aLen) > 0:
+
+            # assume we're going from bigger to smaller
+            bigger = aLen
+            smaller = bLen
+            biggerOffset = indexOffset
+            smallerOffset = indexOffset + aLen
+
+            # going from smaller to bigger
+            if smaller > bigger:
+                bigger = bLen
+                smaller = aLen
+                smallerOffset = indexOffset
+                biggerOffset = indexOffset + aLen
+
+            faces = transitionFaces(bigger, smaller, biggerOffset, smallerOffset, self.transitionCorners)
+
+        # equal number of vertices
+        else:
+            faces = quadStrip(aLen, indexOffset)
+
+        if len(faces) > 0:
+            self.addFaces(faces)
+
+    # join another mesh to this mesh
+    def joinMesh(self, otherMesh, openingIds):
+        offset = self.vertCount
+
+        # add other verts to this mesh
+        self.appendVerts(otherMesh.verts)
+
+        # offset other faces and add to this mesh
+        otherFaces = otherMesh.faces
+        self.addFaces(np.where(otherFaces >= 0, otherFaces + offset, otherFaces))
+
+        # join the meshes on the openings
+        otherOpenings = otherMesh.openings.shifted(offset)
+        for openingId, reverse in openingIds:
+            openingA = self.openings[openingId]
+            openingB = otherOpenings[openingId]
+            if reverse:
+                openingA, openingB = openingB, openingA
+            self.addFaces(bridgeFaces(openingA, openingB))
+        self.orientFaces()
+
+    # join all the edge loop together
+    def processEdgeloops(self):
+        openings = Openings()
+        loopStarts = []
+
+        for i, edgeLoop in enumerate(self.edgeLoops):
+            # add loop's vertices
+            loopStart = self.appendVerts(edgeLoop)
+            loopStarts.append(loopStart)
+
+            # register the vertices that make up openings
+            edgeLoopOpening = self.edgeLoopOpenings[i]
+            if edgeLoopOpening is not False:
+                for openingId, (positions, indices, total) in loopOpenings(edgeLoopOpening).items():
+                    openings.assign(openingId, positions, np.asarray(indices) + loopStart, total)
+
+        # if the first edge loop is a quad, add it's face
+        if len(self.edgeLoops[0]) == 4:
+            self.addFace(range(4))
+
+        # join consecutive loops; runs of equal-length loops are joined in one batch
+        loopLens = [len(l) for l in self.edgeLoops]
+        for first, last in equalLengthRuns(loopLens):
+            if first > 0:
+                self.joinEdgeLoops(self.edgeLoops[first-1], self.edgeLoops[first], loopStarts[first-1])
+            if last > first:
+                self.addFaces(quadStrip(loopLens[first], loopStarts[first], last-first+1))
+
+        # if the last edge loop is a quad, add it's face
+        if len(self.edgeLoops[-1]) == 4:
+            self.addFace([(i+loopStarts[-1]) for i in range(4)])
+
+        self.openings = openings
+        self.removeHoles()
+        self.orientFaces()
+
+    # apply a 4x4 affine matrix to vertices start..end (all by default) in place
+    def transform(self, matrix, start=0, end=None):
+        end = self.vertCount if end is None else end
+        applyTransform(matrix, self.vertBuffer[start:end], out=self.vertBuffer[start:end])
+
+    # Catmull-Clark subdivide the faces in place, like Blender's subsurf modifier
+    def subdivide(self, levels=1):
+        from meshlib.subdivide import subdivide
+        self.verts, self.faces = subdivide(self.verts, self.faces, levels)
+
+    # reduce to `faceCount` triangles or `ratio` of the current triangle count, like Blender's decimate modifier
+    def decimate(self, ratio=None, faceCount=None):
+        from meshlib.decimate import decimate
+        self.verts, self.faces = decimate(self.verts, self.faces, ratio, faceCount)
+
+    # write to .stl, .ply or .obj, depending on the filename
+    def export(self, filename, name="", binary=True, triangulated=False):
+        from meshlib.export import exportMesh
+        exportMesh(filename, self.verts, self.faces, name, binary, triangulated)
+
+    # flip faces so their winding agrees with the reference face (the last one by default)
+    def orientFaces(self, reference=-1):
+        from meshlib import orient
+        self.faces = orient.orientFaces(self.faces, reference)
+
+    # remove "False" vertices and the faces that use them
+    def removeHoles(self):
+        verts = self.verts
+        keep = ~np.isnan(verts[:, 0])
+        if keep.all():
+            return
+
+        # new index of every kept vertex: its index less the holes before it;
+        # hole vertices keep their index, which openings may still refer to
+        remap = (np.arange(len(keep)) - np.where(keep, np.cumsum(~keep), 0)).astype(np.int32)
+
+        # remove faces with "False" vertices, then reindex the rest
+        faces = self.faces
+        used = faces >= 0
+        corners = np.where(used, faces, 0)
+        faces = np.where(used, remap[corners], -1)[(keep[corners] | ~used).all(axis=1)]
+        self.faces = faces
+
+        # remove "False" vertices
+        self.verts = verts[keep]
+
+        # update openings with new indices
+        self.openings.remap(remap)
+
+    def removeFaces(self, indices):
+        keep = np.ones(self.faceCount, dtype=bool)
+        keep[indices] = False
+        self.faces = self.faces[keep]
+
+    def updateEdgeLoops(self, loops, offset0=None, offset1=None):
+        if offset0 is None and offset1 is None:
+            self.edgeLoops = loops[:]
+            self.edgeLoopOpenings = [False for l in loops]
+        else:
+            before = self.edgeLoops[:offset0]
+            after = self.edgeLoops[offset1:]
+            self.edgeLoops = before + loops + after
+            before = self.edgeLoopOpenings[:offset0]
+            after = self.edgeLoopOpenings[offset1:]
+            self.edgeLoopOpenings = before + [False for l in loops] + after
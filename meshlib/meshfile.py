@@ -0,0 +1,99 @@
+import numpy as np
+
+# Binary mesh file, all little-endian:
+#   header: magic "MESH", version, object count, reserved
+#   object table: one OBJECT_DTYPE record per object
+#   data blocks, each starting on an 8-byte boundary:
+#     verts: (vertCount, 3) float32 or float64
+#     faces: (faceCount, 4) int32, triangles padded with -1
+#     flipFaces: (flipCount,) int32 face indices
+# Offsets in the table are from the start of the file, so every block can be
+# read in place with np.frombuffer / np.memmap
+
+MAGIC = b"MESH"
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("count", "<u4"),
+    ("reserved", "<u4")
+])
+
+OBJECT_DTYPE = np.dtype([
+    ("name", "S64"),
+    ("location", "<f8", (3,)),
+    ("vertItemSize", "<u4"),
+    ("reserved", "<u4"),
+    ("vertCount", "<u8"),
+    ("vertOffset", "<u8"),
+    ("faceCount", "<u8"),
+    ("faceOffset", "<u8"),
+    ("flipCount", "<u8"),
+    ("flipOffset", "<u8")
+])
+
+def align(offset, size=8):
+    return (offset + size - 1) // size * size
+
+def writeMeshFile(filename, objects, vertDtype="<f8"):
+    """ Write a list of objects with the same keys as the old mesh.json
+        (name, verts, faces, location and optionally flipFaces)
+    """
+    blocks = []
+    table = np.zeros(len(objects), dtype=OBJECT_DTYPE)
+    offset = align(HEADER_DTYPE.itemsize + table.nbytes)
+
+    for i, o in enumerate(objects):
+        verts = np.ascontiguousarray(o["verts"], dtype=vertDtype).reshape(-1, 3)
+        faces = o["faces"]
+        if not (isinstance(faces, np.ndarray) and faces.ndim == 2 and faces.shape[1] == 4):
+            faces = [tuple(f) + (-1,) * (4-len(f)) for f in faces]
+        faces = np.ascontiguousarray(faces, dtype="<i4").reshape(-1, 4)
+        flipFaces = np.ascontiguousarray(list(o.get("flipFaces", [])), dtype="<i4")
+
+        entry = table[i]
+        entry["name"] = o["name"].encode("utf-8")
+        entry["location"] = o.get("location", (0, 0, 0))
+        entry["vertItemSize"] = verts.itemsize
+        for key, block in [("vert", verts), ("face", faces), ("flip", flipFaces)]:
+            entry[key + "Count"] = len(block)
+            entry[key + "Offset"] = offset
+            blocks.append((offset, block))
+            offset = align(offset + block.nbytes)
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["count"] = len(objects)
+
+    with open(filename, "wb") as f:
+        f.write(header.tobytes())
+        f.write(table.tobytes())
+        for offset, block in blocks:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(block.tobytes())
+
+def readMeshFile(filename):
+    """ Read a mesh file into a list of objects whose verts, faces and
+        flipFaces are read-only arrays mapped from the file
+    """
+    raw = np.memmap(filename, dtype=np.uint8, mode="r")
+    header = np.frombuffer(raw, dtype=HEADER_DTYPE, count=1)[0]
+    if header["magic"] != MAGIC:
+        raise ValueError("%s is not a mesh file" % filename)
+    if header["version"] > VERSION:
+        raise ValueError("%s has unsupported mesh file version %s" % (filename, header["version"]))
+
+    table = np.frombuffer(raw, dtype=OBJECT_DTYPE, count=int(header["count"]), offset=HEADER_DTYPE.itemsize)
+    objects = []
+    for entry in table:
+        vertDtype = "<f4" if entry["vertItemSize"] == 4 else "<f8"
+        objects.append({
+            "name": entry["name"].rstrip(b"\0").decode("utf-8"),
+            "location": tuple(entry["location"].tolist()),
+            "verts": np.frombuffer(raw, dtype=vertDtype, count=int(entry["vertCount"])*3, offset=int(entry["vertOffset"])).reshape(-1, 3),
+            "faces": np.frombuffer(raw, dtype="<i4", count=int(entry["faceCount"])*4, offset=int(entry["faceOffset"])).reshape(-1, 4),
+            "flipFaces": np.frombuffer(raw, dtype="<i4", count=int(entry["flipCount"]), offset=int(entry["flipOffset"]))
+        })
+    return objects
@@ -0,0 +1,60 @@
+import numpy as np
+
+class Openings(object):
+    """ Opening id -> int32 array of the vertex indices around it, in order. Indices are stored
+        relative to a base offset so the whole registry can be shifted in O(1) when its mesh is
+        appended to another one; negative indices mark positions that were never assigned
+    """
+
+    def __init__(self, indices=None, offset=0):
+        self.indices = indices if indices is not None else {}
+        self.offset = offset
+
+    def __contains__(self, openingId):
+        return openingId in self.indices
+
+    def __iter__(self):
+        return iter(self.indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, openingId):
+        indices = self.indices[openingId]
+        if self.offset == 0:
+            return indices
+        return np.where(indices >= 0, indices + self.offset, indices).astype(np.int32)
+
+    def keys(self):
+        return self.indices.keys()
+
+    # set `positions` of an opening of `total` vertices to the given vertex indices
+    def assign(self, openingId, positions, indices, total):
+        if openingId not in self.indices:
+            self.indices[openingId] = np.full(total, -1, dtype=np.int32)
+        self.indices[openingId][np.asarray(positions, dtype=np.intp)] = np.asarray(indices, dtype=np.int32) - self.offset
+
+    # the same openings with every index shifted by `offset`; the arrays are shared, not copied
+    def shifted(self, offset):
+        return Openings(self.indices, self.offset + offset)
+
+    # renumber every index through a vertex index map, e.g. after removing vertices
+    def remap(self, remap):
+        for openingId, indices in self.indices.items():
+            raw = np.where(indices >= 0, indices + self.offset, indices)
+            self.indices[openingId] = np.where(raw >= 0, remap[np.maximum(raw, 0)], raw).astype(np.int32)
+        self.offset = 0
+
+# the per-vertex opening entries of an edge loop ([openingId, position, total], or True/False for
+# vertices outside any opening) as {openingId: (positions, loop indices, total)}
+def loopOpenings(entries):
+    openings = {}
+    for j, v in enumerate(entries):
+        if v is True or v is False:
+            continue
+        vId, vIndex, vTotal = tuple(v)
+        if vId not in openings:
+            openings[vId] = ([], [], vTotal)
+        openings[vId][0].append(vIndex)
+        openings[vId][1].append(j)
+    return openings
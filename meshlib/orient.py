@@ -0,0 +1,68 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+from meshlib.faces import halfEdges
+
+# faces sharing an edge, and whether they run along it in the same direction
+def faceAdjacency(faces):
+    faces = np.asarray(faces)
+    a, b, faceIds = halfEdges(faces)
+
+    # pair up half-edges on the same undirected edge
+    keys = np.minimum(a, b) * (faces.max() + 1) + np.maximum(a, b)
+    order = np.argsort(keys, kind="mergesort")
+    keys = keys[order]
+    pairs = np.nonzero(keys[1:] == keys[:-1])[0]
+    first = order[pairs]
+    second = order[pairs + 1]
+    same = a[first] == a[second]
+    return faceIds[first], faceIds[second], same
+
+def orientFaces(faces, reference=-1):
+    """ Flip faces so that neighbours run along shared edges in opposite
+        directions; each connected part keeps the winding of its face closest
+        to `reference` (by index), the last face by default
+    """
+    faces = np.array(faces, dtype=np.int32).reshape(-1, 4)
+    count = len(faces)
+    if count <= 1:
+        return faces
+    if reference < 0:
+        reference += count
+
+    faceA, faceB, same = faceAdjacency(faces)
+    if len(faceA) <= 0:
+        return faces
+    graph = coo_matrix((same.astype(np.int8) + 1, (faceA, faceB)), shape=(count, count)).tocsr()
+    components, labels = connected_components(graph, directed=False)
+
+    # walk a spanning tree of each part out from its reference face
+    parents = np.arange(count)
+    for component in range(components):
+        members = np.nonzero(labels == component)[0]
+        root = members[np.argmin(np.abs(members - reference))]
+        order, predecessors = breadth_first_order(graph, root, directed=False, return_predecessors=True)
+        parents[order[1:]] = predecessors[order[1:]]
+
+    # a face needs flipping relative to its parent if they share an edge in the same direction
+    pairKeys = np.minimum(faceA, faceB).astype(np.int64) * count + np.maximum(faceA, faceB)
+    order = np.argsort(pairKeys)
+    faceIds = np.arange(count)
+    treeKeys = np.minimum(faceIds, parents).astype(np.int64) * count + np.maximum(faceIds, parents)
+    found = order[np.minimum(np.searchsorted(pairKeys[order], treeKeys), len(order) - 1)]
+    flip = same[found] & (parents != faceIds)
+
+    # accumulate along the tree to each part's reference face by pointer jumping
+    jump = parents.copy()
+    while np.any(jump != jump[jump]):
+        flip ^= flip[jump]
+        jump = jump[jump]
+
+    # reverse winding, keeping the first vertex in place
+    flipped = faces[flip]
+    triangles = flipped[:, 3] < 0
+    flipped[~triangles] = flipped[~triangles][:, [0, 3, 2, 1]]
+    flipped[triangles] = flipped[triangles][:, [0, 2, 1, 3]]
+    faces[flip] = flipped
+    return faces
@@ -0,0 +1,205 @@
+from collections import OrderedDict
+import numpy as np
+
+from meshlib import spline
+
+# ring index arrays keyed by edgesPerSide
+discRingIndices = {}
+
+# indices into an (edgesPerSide+1)^2 grid of the concentric square rings, from the center out
+def discRings(edgesPerSide):
+    if edgesPerSide in discRingIndices:
+        return discRingIndices[edgesPerSide]
+
+    centerRow = edgesPerSide // 2
+    centerCol = edgesPerSide // 2
+    rowLen = edgesPerSide + 1
+
+    # start with one point at the center
+    rings = [np.array([centerRow * rowLen + centerCol])]
+
+    # add rings until we reach the outer one
+    for edges in range(2, edgesPerSide+1, 2):
+        r = edges // 2
+        # same lerp as the original per-vertex walk, so truncation matches
+        steps = 2.0 * r * (1.0 * np.arange(edges) / edges)
+        forward = steps - r
+        backward = r - steps
+        rows = np.concatenate((
+            np.full(edges, centerRow - r, dtype=np.float64), # top
+            centerRow + forward, # right
+            np.full(edges, centerRow + r, dtype=np.float64), # bottom
+            centerRow + backward # left
+        ))
+        cols = np.concatenate((
+            centerCol + forward,
+            np.full(edges, centerCol + r, dtype=np.float64),
+            centerCol + backward,
+            np.full(edges, centerCol - r, dtype=np.float64)
+        ))
+        ring = (rows * rowLen + cols).astype(np.intp)
+        ring.setflags(write=False)
+        rings.append(ring)
+
+    discRingIndices[edgesPerSide] = rings
+    return rings
+
+# pull the concentric rings out of a flattened (edgesPerSide+1)^2 grid of vertices
+def discLoops(grid, edgesPerSide, reverse=False):
+    edgeLoops = [loopTuples(grid[ring]) for ring in discRings(edgesPerSide)]
+    if reverse:
+        edgeLoops = reversed(edgeLoops)
+    return edgeLoops
+
+# unit square grid mapped to circular disc coordinates (UV)
+# https://stackoverflow.com/questions/13211595/how-can-i-convert-coordinates-on-a-circle-to-coordinates-on-a-square
+def discGrid(edgesPerSide):
+    # x, y is between -1 and 1
+    steps = 1.0 * np.arange(edgesPerSide+1) / edgesPerSide * 2 - 1
+    y, x = np.meshgrid(steps, steps, indexing="ij")
+    u = x * np.sqrt(1.0 - 0.5 * (y * y))
+    v = y * np.sqrt(1.0 - 0.5 * (x * x))
+    return u.reshape(-1), v.reshape(-1)
+
+def ellipseMesh(vertices, center, r1, r2, z, reverse=False):
+    edgesPerSide = vertices // 4
+    u, v = discGrid(edgesPerSide)
+    # convert to actual unit
+    grid = np.column_stack((u * r1 + center[0], v * r2 + center[1], np.full(len(u), z, dtype=np.float64)))
+    return discLoops(grid, edgesPerSide, reverse)
+
+def circleMesh(vertices, center, radius, z, reverse=False):
+    return ellipseMesh(vertices, center, radius, radius, z, reverse)
+
+# disc filled from a closed shape of `vertices` unit points; the interior is interpolated row by row
+def shapeMesh(points, width, height, vertices, center, z, reverse=False):
+    edgesPerSide = vertices // 4
+    points = np.array(points, dtype=np.float64)[:, :2]
+    rows = np.arange(edgesPerSide+1)
+    cols = np.arange(edgesPerSide+1)
+
+    # interpolate between the left and right sides of the shape
+    left = points[(vertices - rows) % vertices]
+    right = points[edgesPerSide + rows]
+    xp = 1.0 * cols / edgesPerSide
+    grid = left[:, np.newaxis, :] + (right - left)[:, np.newaxis, :] * xp[np.newaxis, :, np.newaxis]
+
+    # points on the perimeter are taken from the shape
+    grid[0] = points[cols]
+    grid[edgesPerSide] = points[edgesPerSide*3 - cols]
+    grid[:, 0] = left
+    grid[:, edgesPerSide] = right
+    grid[0, 0] = points[0]
+    grid[0, edgesPerSide] = points[edgesPerSide]
+    grid[edgesPerSide, 0] = points[edgesPerSide*3]
+    grid[edgesPerSide, edgesPerSide] = points[edgesPerSide*2]
+
+    grid = grid.reshape(-1, 2)
+    x = (grid[:, 0] * width - width * 0.5) + center[0]
+    y = (grid[:, 1] * height - height * 0.5) + center[1]
+    grid = np.column_stack((x, y, np.full(len(x), z, dtype=np.float64)))
+    return discLoops(grid, edgesPerSide, reverse)
+
+# unit ring profiles keyed by (kind, vertices, ...); each is a read-only (N, 2) array.
+# Least recently used profiles are dropped past PROFILE_CACHE_SIZE, since shape profiles are
+# keyed by their control points and a sweep can try many shapes
+PROFILE_CACHE_SIZE = 256
+ringProfiles = OrderedDict()
+
+def cachedProfile(key, build):
+    if key in ringProfiles:
+        # move to the most recently used end
+        profile = ringProfiles.pop(key)
+    else:
+        profile = np.array(build(), dtype=np.float64)
+        profile.setflags(write=False)
+        while len(ringProfiles) >= PROFILE_CACHE_SIZE:
+            ringProfiles.popitem(last=False)
+    ringProfiles[key] = profile
+    return profile
+
+# a ring of (x, y) profile points scaled, moved to center and given a z, as an (N, 3) array
+def ringPoints(profile, scale, center, z):
+    ring = np.empty((len(profile), 3))
+    ring[:, 0] = profile[:, 0] * scale[0] + center[0]
+    ring[:, 1] = profile[:, 1] * scale[1] + center[1]
+    ring[:, 2] = z
+    return ring
+
+# (x, y) around the edge of the unit square from (-1, -1): top, right, bottom, left
+def squareRing(vertices):
+    edgesPerSide = vertices // 4
+    steps = 1.0 * np.arange(edgesPerSide) / edgesPerSide * 2 - 1
+    ones = np.ones(edgesPerSide)
+    x = np.concatenate((steps, ones, -steps, -ones))
+    y = np.concatenate((-ones, steps, ones, -steps))
+    return x, y
+
+def ellipseProfile(vertices):
+    def build():
+        x, y = squareRing(vertices)
+        # same square to disc mapping as discGrid
+        return np.column_stack((x * np.sqrt(1.0 - 0.5 * (y * y)), y * np.sqrt(1.0 - 0.5 * (x * x))))
+    return cachedProfile(("ellipse", vertices), build)
+
+def ellipseRing(vertices, center, r1, r2, z):
+    return ringPoints(ellipseProfile(vertices), (r1, r2), center, z)
+
+# unit circle starting at angleStart degrees, counter clockwise
+def circleProfile(vertices, angleStart=0.0):
+    def build():
+        radians = np.radians(angleStart + 360.0 / vertices * np.arange(vertices))
+        return np.column_stack((np.cos(radians), np.sin(radians)))
+    return cachedProfile(("circle", vertices, angleStart), build)
+
+def circleRing(vertices, center, radius, z, angleStart=0.0):
+    return ringPoints(circleProfile(vertices, angleStart), (radius, radius), center, z)
+
+# `vertices` points on a closed bspline through the shape's points, starting an eighth of the way back
+def shapeProfile(points, vertices):
+    points = tuple(tuple(p) for p in points)
+    def build():
+        splined = np.asarray(spline.bspline(points, n=vertices+1, periodic=True))[:-1]
+        return np.roll(splined, vertices // 8, axis=0)
+    return cachedProfile(("shape", vertices, points), build)
+
+# a unit shape stretched to width x height; shapes with fewer points than vertices are splined first
+def shapeRing(points, width, height, vertices, center, z):
+    if vertices > len(points):
+        profile = shapeProfile(points, vertices)
+    else:
+        profile = np.asarray(points, dtype=np.float64)[:, :2]
+    ring = np.empty((len(profile), 3))
+    ring[:, 0] = profile[:, 0] * width - width * 0.5 + center[0]
+    ring[:, 1] = profile[:, 1] * height - height * 0.5 + center[1]
+    ring[:, 2] = z
+    return ring
+
+# rectangle with corners rounded off by a bspline through 16 control points; r is how far along
+# each side the rounding starts. The control points move with the size, so only the spline's
+# basis is cached. By default the corners are only rounded when there are more than 16 vertices
+def roundedRectRing(vertices, center, w, h, z, r, smooth=None):
+    cx, cy = center[0], center[1]
+    x0, x1 = cx - w * 0.5, cx + w * 0.5
+    y0, y1 = cy - h * 0.5, cy + h * 0.5
+    square = np.array([
+        # top left -> top right
+        (x0, y0), (x0 + r, y0), (cx, y0), (x0 + w - r, y0),
+        # top right -> bottom right
+        (x1, y0), (x1, y0 + r), (x1, cy), (x1, y0 + h - r),
+        # bottom right -> bottom left
+        (x1, y1), (x1 - r, y1), (cx, y1), (x1 - w + r, y1),
+        # bottom left -> top left
+        (x0, y1), (x0, y1 - r), (x0, cy), (x0, y1 - h + r)
+    ])
+    if smooth or smooth is None and vertices > len(square):
+        rounded = spline.basisMatrix(len(square), n=vertices+1, periodic=True).dot(square)[:-1]
+        square = np.roll(rounded, vertices // 8, axis=0)
+    ring = np.empty((len(square), 3))
+    ring[:, :2] = square
+    ring[:, 2] = z
+    return ring
+
+# loops handed to the pieces' scripts are lists of (x, y, z) tuples
+def loopTuples(ring):
+    return [tuple(v) for v in ring.tolist()]
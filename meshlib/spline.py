@@ -0,0 +1,67 @@
+import numpy as np
+from scipy import interpolate
+
+# basis matrices keyed by (count, degree, n, periodic)
+basisMatrices = {}
+
+def basisMatrix(count, degree=3, n=100, periodic=True):
+    """ Matrix that maps count control vertices to n samples on a bspline
+
+        Samples for any stack of control polygons with the same count are
+        basisMatrix(...).dot(cv); the matrix is built once and cached.
+    """
+    key = (count, degree, n, bool(periodic))
+    if key in basisMatrices:
+        return basisMatrices[key]
+
+    # If periodic, extend the point array by count+degree+1
+    indices = np.arange(count)
+    if periodic:
+        factor, fraction = divmod(count+degree+1, count)
+        indices = np.concatenate((indices,) * factor + (indices[:fraction],))
+        degree = max(degree, 1)
+
+    # If opened, prevent degree from exceeding count-1
+    else:
+        degree = int(np.clip(degree, 1, count-1))
+    extended = len(indices)
+
+    # Calculate knot vector
+    if periodic:
+        kv = np.arange(0-degree, extended+degree+degree-1)
+    else:
+        kv = np.clip(np.arange(extended+degree+1)-degree, 0, extended-degree)
+
+    # Calculate query range
+    u = np.linspace(periodic, (extended-degree), n)
+
+    # evaluate each basis function, then fold the repeated (periodic) vertices back together
+    basis = np.array(interpolate.splev(u, (kv, list(np.eye(extended)), degree))).T
+    matrix = np.zeros((n, count))
+    for j, index in enumerate(indices):
+        matrix[:, index] += basis[:, j]
+
+    matrix.setflags(write=False)
+    basisMatrices[key] = matrix
+    return matrix
+
+def bspline(cv, n=100, degree=3, periodic=True):
+    """ Calculate n samples on a bspline
+
+        cv :      Array ov control vertices
+        n  :      Number of samples to return
+        degree:   Curve degree
+        periodic: True - Curve is closed
+                  False - Curve is open
+    """
+    cv = np.asarray(cv, dtype=np.float64)
+    return basisMatrix(len(cv), degree, n, periodic).dot(cv).tolist()
+
+def bsplineBatch(cvs, n=100, degree=3, periodic=True):
+    """ Calculate n samples on many bsplines at once
+
+        cvs is an array of shape (..., count, dimensions) of control polygons
+        that share the same count; returns an array of shape (..., n, dimensions)
+    """
+    cvs = np.asarray(cvs, dtype=np.float64)
+    return np.matmul(basisMatrix(cvs.shape[-2], degree, n, periodic), cvs)
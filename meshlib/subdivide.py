@@ -0,0 +1,75 @@
+import numpy as np
+
+from meshlib.faces import halfEdges
+
+def sumBy(ids, values, count):
+    """ Sum (N, 3) values into `count` bins """
+    return np.column_stack([np.bincount(ids, values[:, k], minlength=count) for k in range(3)])
+
+def subdivideOnce(verts, faces):
+    """ One level of Catmull-Clark subdivision of (M, 4) faces padded with -1;
+        returns verts ordered [vertex points, edge points, face points] and one quad per face corner
+    """
+    verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces).reshape(-1, 4)
+    vertCount = len(verts)
+    faceCount = len(faces)
+
+    a, b, faceIds = halfEdges(faces)
+    sizes = np.bincount(faceIds, minlength=faceCount)
+    facePoints = sumBy(faceIds, verts[a], faceCount) / sizes[:, np.newaxis]
+
+    # edge table: one row per undirected edge, shared by the half-edges on it
+    edgeKeys, edgeIds = np.unique(np.minimum(a, b) * vertCount + np.maximum(a, b), return_inverse=True)
+    edgeCount = len(edgeKeys)
+    edgeA = edgeKeys // vertCount
+    edgeB = edgeKeys % vertCount
+    edgeFaces = np.bincount(edgeIds, minlength=edgeCount)
+    boundary = edgeFaces != 2
+
+    # edge points average the edge's ends with the adjacent face points; boundary edges stay at their midpoint
+    midpoints = (verts[edgeA] + verts[edgeB]) * 0.5
+    edgePoints = (verts[edgeA] + verts[edgeB] + sumBy(edgeIds, facePoints[faceIds], edgeCount)) / (2 + edgeFaces)[:, np.newaxis]
+    edgePoints[boundary] = midpoints[boundary]
+
+    # vertex points: (F + 2R + (n-3)P) / n with F the average adjacent face point and R the average edge midpoint
+    ends = np.concatenate((edgeA, edgeB))
+    valence = np.bincount(ends, minlength=vertCount).astype(np.float64)
+    vertFaces = np.bincount(a, minlength=vertCount)
+    inner = (valence > 0) & (vertFaces > 0)
+    F = sumBy(a, facePoints[faceIds], vertCount)[inner] / vertFaces[inner][:, np.newaxis]
+    R = sumBy(ends, np.concatenate((midpoints, midpoints)), vertCount)[inner] / valence[inner][:, np.newaxis]
+    n = valence[inner][:, np.newaxis]
+    vertPoints = verts.copy()
+    vertPoints[inner] = (F + 2.0 * R + (n - 3.0) * verts[inner]) / n
+
+    # boundary vertices only follow their two boundary neighbours; non-manifold corners stay put
+    boundaryEnds = np.concatenate((edgeA[boundary], edgeB[boundary]))
+    boundaryOthers = np.concatenate((edgeB[boundary], edgeA[boundary]))
+    boundaryValence = np.bincount(boundaryEnds, minlength=vertCount)
+    neighbours = sumBy(boundaryEnds, verts[boundaryOthers], vertCount)
+    curve = boundaryValence == 2
+    vertPoints[curve] = verts[curve] * 0.75 + neighbours[curve] * 0.125
+    corner = boundaryValence > 2
+    vertPoints[corner] = verts[corner]
+
+    # each face corner becomes a quad: vertex, edge to the next vertex, face point, edge from the previous vertex
+    starts = np.cumsum(sizes) - sizes
+    corners = np.arange(len(a)) - starts[faceIds]
+    previous = starts[faceIds] + (corners - 1) % sizes[faceIds]
+    newFaces = np.column_stack((
+        a,
+        vertCount + edgeIds,
+        vertCount + edgeCount + faceIds,
+        vertCount + edgeIds[previous]
+    )).astype(np.int32)
+
+    return np.concatenate((vertPoints, edgePoints, facePoints)), newFaces
+
+def subdivide(verts, faces, levels=1):
+    """ Catmull-Clark subdivide a mesh `levels` times, like Blender's subsurf modifier """
+    verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+    for level in range(levels):
+        verts, faces = subdivideOnce(verts, faces)
+    return verts, faces
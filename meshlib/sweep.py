@@ -0,0 +1,176 @@
+import ast
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import traceback
+
+from meshlib.imagemap import ImageMap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# constants naming the files a script writes besides OUTPUT_FILE, with their default names;
+# these are redirected too so variants don't overwrite the checked-in files or each other
+SCRIPT_OUTPUTS = {"pot/mesh.py": {"LID_CONFIG_FILE": "pot_lid_config.json"}}
+
+def scriptPath(piece):
+    """ A piece's folder (e.g. "cup") means its mesh.py; a path to a .py file is used as is """
+    path = piece if piece.endswith(".py") else os.path.join(piece, "mesh.py")
+    if not os.path.isabs(path):
+        path = os.path.join(ROOT, path)
+    return os.path.normpath(path)
+
+def scriptOutputs(piece):
+    """ {constant: default filename} of the files a piece's script writes besides OUTPUT_FILE """
+    key = os.path.relpath(scriptPath(piece), ROOT).replace(os.sep, "/")
+    return dict(SCRIPT_OUTPUTS.get(key, {}))
+
+class ConfigOverride(ast.NodeTransformer):
+    """ Replace the value of module-level assignments to the given names with a lookup of the override """
+
+    def __init__(self, names):
+        self.names = set(names)
+        self.found = set()
+
+    def visit_FunctionDef(self, node):
+        return node
+
+    def visit_ClassDef(self, node):
+        return node
+
+    def visit_Assign(self, node):
+        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name) and node.targets[0].id in self.names:
+            name = node.targets[0].id
+            self.found.add(name)
+            node.value = ast.copy_location(ast.Name(id=overrideName(name), ctx=ast.Load()), node.value)
+        return node
+
+def overrideName(name):
+    return "__config_%s" % name
+
+def scriptConstants(filename):
+    """ Names of a script's module-level UPPER_CASE constants """
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name.isupper() and name not in names:
+                names.append(name)
+    return names
+
+def generate(piece, config=None):
+    """ Run a piece's script with some of its constants replaced, e.g.
+        generate("cup", {"THICKNESS": 4.8, "OUTPUT_FILE": "/tmp/cup.bin"}).
+        Constants derived from the replaced ones are recomputed as usual.
+        Runs in the script's folder; returns the script's resolved constants
+    """
+    config = config or {}
+    filename = scriptPath(piece)
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+    override = ConfigOverride(config.keys())
+    tree = ast.fix_missing_locations(override.visit(tree))
+    unknown = sorted(set(config.keys()) - override.found)
+    if len(unknown) > 0:
+        raise ValueError("%s has no constants named %s" % (filename, ", ".join(unknown)))
+
+    scriptDir = os.path.dirname(filename)
+    scriptGlobals = {"__name__": "__main__", "__file__": filename}
+    for name, value in config.items():
+        scriptGlobals[overrideName(name)] = value
+
+    # each piece has its own lib.py, so drop whichever one an earlier run imported
+    cwd = os.getcwd()
+    argv = sys.argv
+    path = list(sys.path)
+    sys.modules.pop("lib", None)
+    try:
+        os.chdir(scriptDir)
+        sys.argv = [filename]
+        sys.path.insert(0, scriptDir)
+        exec(compile(tree, filename, "exec"), scriptGlobals)
+    finally:
+        os.chdir(cwd)
+        sys.argv = argv
+        sys.path[:] = path
+        sys.modules.pop("lib", None)
+
+    return dict((name, value) for name, value in scriptGlobals.items() if name.isupper() and isJsonValue(value))
+
+def isJsonValue(value):
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def parameterGrid(params):
+    """ Every combination of a {name: [values]} mapping, in a fixed order """
+    names = sorted(params.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*[params[name] for name in names])]
+
+def prepareImageMaps(piece):
+    """ Write the .npy sidecars for a piece's image maps once, so every worker maps the same file
+        read-only instead of decoding its own copy (or racing to write the sidecar)
+    """
+    for filename in sorted(glob.glob(os.path.join(os.path.dirname(scriptPath(piece)), "*.png"))):
+        ImageMap(filename)
+
+def runVariant(task):
+    piece, index, config, outputs, quiet = task
+    result = {"index": index, "config": config, "outputs": dict((name, os.path.basename(path)) for name, path in outputs.items())}
+    variantConfig = dict(config)
+    variantConfig.update(outputs)
+    stdout = sys.stdout
+    devnull = open(os.devnull, "w") if quiet else None
+    try:
+        if devnull is not None:
+            sys.stdout = devnull
+        result["constants"] = generate(piece, variantConfig)
+    except Exception:
+        result["error"] = traceback.format_exc()
+    finally:
+        sys.stdout = stdout
+        if devnull is not None:
+            devnull.close()
+    return result
+
+def sweep(piece, params, outputDir, workers=None, quiet=True):
+    """ Generate one variant per combination of `params` across a process pool; variant i is written
+        to outputDir/<i>.bin, any other files it writes to outputDir/<i>_<name>, and a manifest.json
+        lists each variant's config, output files, constants or error
+    """
+    outputDir = os.path.abspath(outputDir)
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+    prepareImageMaps(piece)
+
+    tasks = []
+    for i, config in enumerate(parameterGrid(params)):
+        outputs = {"OUTPUT_FILE": os.path.join(outputDir, "%s.bin" % i)}
+        for name, filename in scriptOutputs(piece).items():
+            outputs[name] = os.path.join(outputDir, "%s_%s" % (i, filename))
+        # an output swept on purpose is left where it was asked for
+        outputs = dict((name, path) for name, path in outputs.items() if name not in config)
+        tasks.append((piece, i, config, outputs, quiet))
+
+    workers = workers if workers and workers > 0 else multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(min(workers, max(len(tasks), 1)), maxtasksperchild=1)
+    try:
+        results = []
+        for result in pool.imap_unordered(runVariant, tasks):
+            status = "failed" if "error" in result else "done"
+            print("Variant %s %s: %s" % (result["index"], status, json.dumps(result["config"], sort_keys=True)))
+            results.append(result)
+    finally:
+        pool.close()
+        pool.join()
+
+    results = sorted(results, key=lambda r: r["index"])
+    with open(os.path.join(outputDir, "manifest.json"), "w") as f:
+        json.dump({"piece": piece, "params": params, "variants": results}, f, indent=1, sort_keys=True)
+    return results
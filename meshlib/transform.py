@@ -0,0 +1,63 @@
+import math
+import numpy as np
+
+# 4x4 affine matrices that act on column vectors: p' = M p
+
+def identity():
+    return np.eye(4)
+
+def translation(v):
+    m = np.eye(4)
+    m[:3, 3] = v
+    return m
+
+def scaling(s, center=(0, 0, 0)):
+    m = np.eye(4)
+    m[[0, 1, 2], [0, 1, 2]] = s
+    return aboutCenter(m, center)
+
+# move `center` to the origin, apply m, and move back
+def aboutCenter(m, center):
+    if tuple(center) == (0, 0, 0):
+        return m
+    return compose(translation(-np.asarray(center, dtype=np.float64)), m, translation(center))
+
+# rotations turn the same way as the old per-point versions in the pieces' lib.py:
+# around x from z towards y, around y from z towards x, around z from x towards y
+def rotationX(center, degrees):
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    m = np.eye(4)
+    m[1, 1:3] = (c, s)
+    m[2, 1:3] = (-s, c)
+    return aboutCenter(m, center)
+
+def rotationY(center, degrees):
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    m = np.eye(4)
+    m[0, [0, 2]] = (c, s)
+    m[2, [0, 2]] = (-s, c)
+    return aboutCenter(m, center)
+
+def rotationZ(center, degrees):
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    m = np.eye(4)
+    m[0, 0:2] = (c, -s)
+    m[1, 0:2] = (s, c)
+    return aboutCenter(m, center)
+
+# a single matrix doing each of the given matrices in turn, the first one first
+def compose(*matrices):
+    m = np.eye(4)
+    for matrix in matrices:
+        m = np.dot(matrix, m)
+    return m
+
+# transform an (N, 3) block of points; pass the points as `out` to transform them in place
+def applyTransform(m, points, out=None):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    result = np.dot(points, m[:3, :3].T)
+    result += m[:3, 3]
+    if out is None:
+        return result
+    out[...] = result
+    return out
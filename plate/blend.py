@@ -5,15 +5,17 @@
     # exec(compile(open(filepath).read(), filepath, 'exec'))
 
 import bpy
-import json
 import math
 import os
+import sys
 
 # bpy.app.debug_wm = True
 
-data = []
-with open(bpy.path.abspath("//mesh.json")) as f:
-    data = json.load(f)
+sys.path.append(os.path.abspath(bpy.path.abspath("//..")))
+from meshlib.blender import fillMesh
+from meshlib.meshfile import readMeshFile
+
+data = readMeshFile(bpy.path.abspath("//mesh.bin"))
 
 # blend starts here
 scene = bpy.context.scene
@@ -43,21 +45,12 @@ for d in data:
     obj.location = tuple(d["location"])
     bpy.context.scene.objects.link(obj)
 
-    # convert lists to tuples
-    verts = [tuple(v) for v in d["verts"]]
-    edges = [tuple(v) for v in d["edges"]]
-    faces = [tuple(f) for f in d["faces"]]
-
     # Create mesh from data
-    mesh.from_pydata(verts, edges, faces)
+    fillMesh(mesh, d["verts"], d["faces"])
 
     # Calculate the edges
     mesh.update(calc_edges=True)
 
-    # Flip some of the faces
-    for i in d["flipFaces"]:
-        mesh.polygons[i].flip()
-
     # Rotate the object 45 degrees (to stay within intended bounding box)
     rad = math.radians(45)
     obj.rotation_euler = (0, 0, rad)
@@ -3,7 +3,7 @@
 import json
 import math
 import numpy as np
-from PIL import Image, ImageDraw, ImageFilter
+from PIL import Image, ImageFilter
 from pprint import pprint
 from pyproj import Proj
 from scipy import interpolate
@@ -24,18 +24,54 @@ def angleBetweenPoints(p1, p2):
     rad = math.atan2(deltaY, deltaX)
     return math.degrees(rad)
 
+def fillQuadGradient(buffer, p1, p2, p3, p4, value=255):
+    """ Fill the quad [p1, p2, p4, p3] of a 2D buffer with a gradient that goes
+        from 0 along the p1-p2 edge to value along the p3-p4 edge
+    """
+    h, w = buffer.shape
+    quad = np.array([p1, p2, p3, p4], dtype=np.float64)
+    x0 = max(int(math.floor(quad[:, 0].min())), 0)
+    x1 = min(int(math.ceil(quad[:, 0].max())), w-1)
+    y0 = max(int(math.floor(quad[:, 1].min())), 0)
+    y1 = min(int(math.ceil(quad[:, 1].max())), h-1)
+    if x0 > x1 or y0 > y1:
+        return
+
+    # invert the bilinear mapping p1 + s*(p2-p1) + t*(p3-p1) + s*t*(p1-p2-p3+p4) for every pixel in the quad's bounds
+    # https://www.iquilezles.org/www/articles/ibilinear/ibilinear.htm
+    e = quad[1] - quad[0]
+    f = quad[2] - quad[0]
+    g = quad[0] - quad[1] - quad[2] + quad[3]
+    y, x = np.mgrid[y0:y1+1, x0:x1+1]
+    hx = x - quad[0][0]
+    hy = y - quad[0][1]
+    k2 = g[0] * f[1] - g[1] * f[0]
+    k1 = (e[0] * f[1] - e[1] * f[0]) + (hx * g[1] - hy * g[0])
+    k0 = hx * e[1] - hy * e[0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if abs(k2) < 1e-9:
+            roots = [-k0 / k1]
+        else:
+            root = np.sqrt(k1 * k1 - 4.0 * k0 * k2)
+            roots = [(-k1 - root) / (2.0 * k2), (-k1 + root) / (2.0 * k2)]
+
+        # where a pixel maps into the quad twice, keep the larger t so the far edge wins
+        t = np.full(x.shape, np.nan)
+        for v in roots:
+            dx = e[0] + g[0] * v
+            dy = e[1] + g[1] * v
+            u = ((hx - f[0] * v) * dx + (hy - f[1] * v) * dy) / (dx * dx + dy * dy)
+            valid = (v >= -1e-6) & (v <= 1 + 1e-6) & (u >= -1e-6) & (u <= 1 + 1e-6)
+            t = np.fmax(t, np.where(valid, v, np.nan))
+
+    inside = ~np.isnan(t)
+    region = buffer[y0:y1+1, x0:x1+1]
+    region[inside] = np.floor(np.clip(t[inside], 0, 1) * value + 0.5)
+
 def lerp(a, b, mu):
     return (b-a) * mu + a
 
-def lerpPoint(p1, p2, mu):
-    xs = [p1[0], p2[0]]
-    ys = [p1[1], p2[1]]
-    deltaX = p2[0] - p1[0]
-    x = deltaX * mu + p1[0]
-    func = interpolate.interp1d(xs, ys)
-    y = func(x)
-    return (x, y)
-
 def lim(value, v0, v1):
     if value < v0:
         value = v0
@@ -123,8 +159,7 @@ for i,d in enumerate(data):
     data[i]["x"] = x
     data[i]["y"] = y
 
-im = Image.new('RGB', (TARGET_W, TARGET_H), (0,0,0))
-draw = ImageDraw.Draw(im)
+pixels = np.zeros((TARGET_H, TARGET_W, 3), dtype=np.uint8)
 
 # R = x delta, 255 => highest delta
 # G = y delta, 255 => highest delta
@@ -157,20 +192,8 @@ for i,d in enumerate(data):
         p4 = limPoint(p4, (0, TARGET_W), (0, TARGET_H))
         prevP4 = p4
 
-        # draw.polygon([p1, p2, p4, p3], outline=(0,0,255))
-        distTop = math.hypot(p4[0] - p1[0], p4[1] - p1[1])
-        distBottom = math.hypot(p3[0] - p2[0], p3[1] - p2[1])
-        dist = int(round(max([distTop, distBottom])))
-
-        for j in range(dist):
-            percent = 1.0 * j / (dist-1)
-            pTop = lerpPoint(p1, p3, percent)
-            pBottom = lerpPoint(p2, p4, percent)
-            pTop = limPoint(pTop, (0, TARGET_W), (0, TARGET_H))
-            pBottom = limPoint(pBottom, (0, TARGET_W), (0, TARGET_H))
-            b = int(round(255*percent))
-            draw.line([pTop, pBottom], fill=(0, 0, b))
-del draw
+        # fill [p1, p2, p4, p3] with a blue gradient that increases away from the fault
+        fillQuadGradient(pixels[:, :, 2], p1, p2, p3, p4)
 
 print "Drawing fault x,y direction..."
 # make left-of-fault white (total delta) and right-of-fault black (no delta), make a gradient by the edge
@@ -179,28 +202,23 @@ xs[0] = 0
 xs[-1] = TARGET_H
 ys = [d["x"] for d in data]
 func1 = interpolate.interp1d(xs, ys, kind='linear')
-imgData = list(im.getdata())
-newImgData = []
-for y in range(TARGET_H):
-    for x in range(TARGET_W):
-        i = y * TARGET_W + x
-        (r, g, b) = imgData[i]
-        xActual = func1(y)
-
-        if b == 0 and x < xActual:
-            b = 255
-        rgb = (0, 0, b)
-
-        if x < xActual:
-            rgb = (255, 255, b)
-            # make a gradient
-            delta = (xActual-x)
-            if delta < X_DELTA:
-                percent = 1.0 * delta / X_DELTA
-                color = int(round(percent * 255))
-                rgb = (color, color, b)
-        newImgData.append(rgb)
-im.putdata(newImgData)
+b = pixels[:, :, 2]
+
+# x position of the fault for every row, and every pixel's distance to the left of it
+xActual = func1(np.arange(TARGET_H))[:, np.newaxis]
+x = np.arange(TARGET_W)[np.newaxis, :]
+delta = xActual - x
+left = x < xActual
+
+b[(b == 0) & left] = 255
+rg = np.where(left, 255, 0)
+# make a gradient
+edge = left & (delta < X_DELTA)
+percent = 1.0 * delta[edge] / X_DELTA
+rg[edge] = np.floor(percent * 255 + 0.5)
+pixels[:, :, 0] = rg
+pixels[:, :, 1] = rg
+im = Image.fromarray(pixels)
 
 print "Adding blur..."
 # add Gaussian filter
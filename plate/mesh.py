@@ -1,22 +1,19 @@
 # -*- coding: utf-8 -*-
 
-import colorsys
-import json
 from lib import *
 import math
-from PIL import Image, ImageDraw
+import numpy as np
 from pprint import pprint
 import sys
 
 # data config
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 PRECISION = 8
 IMAGE_MAP_FILE = "imgMap.png"
 
 # retrieve image map data
-im = Image.open(IMAGE_MAP_FILE)
-IMAGE_MAP_W, IMAGE_MAP_H = im.size
-IMAGE_MAP = list(im.getdata())
+IMAGE_MAP = ImageMap(IMAGE_MAP_FILE)
+IMAGE_MAP_W, IMAGE_MAP_H = IMAGE_MAP.width, IMAGE_MAP.height
 
 # cup config in mm
 BASE_VERTICES = 16 # don't change this as it will break rounded rectangles
@@ -31,6 +28,7 @@ HEIGHT = 24.0
 EDGE_RADIUS = 4.0
 THICKNESS = 6.5
 DISPLACEMENT = (-4.0, 4.0, -3.0)
+BILINEAR = False # sample the image map with bilinear filtering
 BASE_HEIGHT = 8.0
 MIN_HEIGHT = 2.5
 BASE_STAND_WIDTH = 5.0
@@ -106,7 +104,7 @@ for i, d in enumerate(loopData):
 # displace edge loops with image map
 r = WIDTH * 0.5
 bounds = [(-r, -r), (r, r)]
-mesh.displaceEdgeLoops(IMAGE_MAP, IMAGE_MAP_W, IMAGE_MAP_H, bounds, DISPLACEMENT, IMAGE_SCALE, IMAGE_TRANSLATE, MIN_HEIGHT)
+mesh.displaceEdgeLoops(IMAGE_MAP.pixels, IMAGE_MAP_W, IMAGE_MAP_H, bounds, DISPLACEMENT, IMAGE_SCALE, IMAGE_TRANSLATE, MIN_HEIGHT, BILINEAR)
 
 print "Calculating faces..."
 # generate faces from vertices
@@ -116,15 +114,12 @@ mesh.processEdgeloops()
 data = [
     {
         "name": "Plate",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range((VERTICES_PER_EDGE_LOOP/4)**2)
+        "location": CENTER
     }
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
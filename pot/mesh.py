@@ -2,12 +2,13 @@
 
 import json
 from lib import *
+from meshlib import transform
 import math
 from pprint import pprint
 import sys
 
 # data config
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 PRECISION = 8
 
 # cup config in mm
@@ -606,8 +607,6 @@ for i, h in enumerate(SPOUT):
         x, y, z, c = h
     loop = shape(SPOUT_SHAPE, x, y, SPOUT_VERTICES_PER_EDGE_LOOP, c, z)
     loop = rotateY(loop, c, -90.0+r)
-    loop = rotateY(loop, SPOUT_ROTATE_CENTER, SPOUT_ROTATE)
-    loop = translateLoop(loop, SPOUT_TRANSLATE)
     loopOpening = False
     offset = SPOUT_VERTICES_PER_EDGE_LOOP/4
     if i == 0:
@@ -618,6 +617,9 @@ for i, h in enumerate(SPOUT):
 
 smesh.processEdgeloops()
 
+# rotate and move the whole spout into place
+smesh.transform(transform.compose(transform.rotationY(SPOUT_ROTATE_CENTER, SPOUT_ROTATE), transform.translation(SPOUT_TRANSLATE)))
+
 # connect the main mesh to the spout mesh
 mesh.joinMesh(smesh, [(SPOUT_OUTER_OPENING_ID, False), (SPOUT_INNER_OPENING_ID, True)])
 
@@ -625,22 +627,20 @@ mesh.joinMesh(smesh, [(SPOUT_OUTER_OPENING_ID, False), (SPOUT_INNER_OPENING_ID,
 data = [
     {
         "name": "Pot",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range((VERTICES_PER_EDGE_LOOP/4)**2)
+        "location": CENTER
     }
     # ,{
     #     "name": "Handle",
-    #     "verts": roundP(hmesh.verts, PRECISION),
+    #     "verts": np.round(hmesh.verts, PRECISION),
     #     "edges": [],
     #     "faces": hmesh.faces,
     #     "location": (0.0, 0.0, 0.0)
     # }
     # ,{
     #     "name": "Spout",
-    #     "verts": roundP(smesh.verts, PRECISION),
+    #     "verts": np.round(smesh.verts, PRECISION),
     #     "edges": [],
     #     "faces": smesh.faces,
     #     "location": (0.0, 0.0, 0.0)
@@ -648,9 +648,8 @@ data = [
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
 
 # Write some config for the pot top
 LID_CONFIG_FILE = "pot_lid_config.json"
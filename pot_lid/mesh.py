@@ -8,12 +8,12 @@ import sys
 
 # data config
 INPUT_FILE = "../pot/pot_lid_config.json"
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 # IMG_MAP_FILE = "imgMap.png"
 PRECISION = 8
 SHOW_ACTUAL_POSITION = False
 if SHOW_ACTUAL_POSITION:
-    OUTPUT_FILE = "mesh_actual.json"
+    OUTPUT_FILE = "mesh_actual.bin"
 
 # cup config in mm
 BASE_VERTICES = 16 # don't change this as it will break rounded rectangles
@@ -138,15 +138,12 @@ mesh.processEdgeloops()
 data = [
     {
         "name": "Pot lid",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range((VERTICES_PER_EDGE_LOOP/4)**2)
+        "location": CENTER
     }
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
@@ -5,19 +5,21 @@
     # exec(compile(open(filepath).read(), filepath, 'exec'))
 
 import bpy
-import json
 import math
 import os
+import sys
 
 # bpy.app.debug_wm = True
 
-filenames = ["mesh_20.json", "mesh_08.json"]
+sys.path.append(os.path.abspath(bpy.path.abspath("//../..")))
+from meshlib.blender import fillMesh
+from meshlib.meshfile import readMeshFile
+
+filenames = ["mesh_20.bin", "mesh_08.bin"]
 
 data = []
 for filename in filenames:
-    with open(bpy.path.abspath("//"+filename)) as f:
-        d = json.load(f)
-        data += d
+    data += readMeshFile(bpy.path.abspath("//"+filename))
 
 # blend starts here
 scene = bpy.context.scene
@@ -47,22 +49,12 @@ for d in data:
     obj.location = tuple(d["location"])
     bpy.context.scene.objects.link(obj)
 
-    # convert lists to tuples
-    verts = [tuple(v) for v in d["verts"]]
-    edges = [tuple(v) for v in d["edges"]]
-    faces = [tuple(f) for f in d["faces"]]
-
     # Create mesh from data
-    mesh.from_pydata(verts, edges, faces)
+    fillMesh(mesh, d["verts"], d["faces"])
 
     # Calculate the edges
     mesh.update(calc_edges=True)
 
-    # Flip some of the faces
-    if "flipFaces" in d:
-        for i in d["flipFaces"]:
-            mesh.polygons[i].flip()
-
     # Select the object
     obj.select = True
 
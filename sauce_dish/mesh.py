@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 
 # python mesh.py -percent 0.2
-# python mesh.py -out "both/mesh_08.json" -offset -22
-# python mesh.py -out "both/mesh_20.json" -offset 22 -percent 0.2
+# python mesh.py -out "both/mesh_08.bin" -offset -22
+# python mesh.py -out "both/mesh_20.bin" -offset 22 -percent 0.2
 
 import argparse
 import csv
-import json
 from lib import *
 import os
 from pprint import pprint
@@ -15,7 +14,7 @@ import sys
 parser = argparse.ArgumentParser()
 parser.add_argument('-percent', dest="PERCENT", type=float, default=0.086, help="Percent of people serving in military during WW2: 8.6 percent of all Americans and 20 percent of Chinese in America")
 parser.add_argument('-offset', dest="OFFSET", type=float, default=0, help="Offset the position of the saucer")
-parser.add_argument('-out', dest="OUTPUT_FILE", default="mesh.json", help="Output JSON file")
+parser.add_argument('-out', dest="OUTPUT_FILE", default="mesh.bin", help="Output mesh file")
 args = parser.parse_args()
 
 # data config
@@ -177,19 +176,19 @@ for j in range(loopsForDivider):
     prev = [tl, tr] + indices[:] + [bl, br]
     i += indicesPerLoop
 
+# make the divider's winding agree with the rest of the dish
+mesh.orientFaces()
+
 # save data
 data = [
     {
         "name": "Sauce dish",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": range(21)
+        "location": CENTER
     }
 ]
 
 print "Writing to file..."
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
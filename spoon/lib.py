@@ -4,122 +4,21 @@ import numpy as np
 import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from meshlib import Mesh as BaseMesh
+from meshlib.meshfile import writeMeshFile
+from meshlib.shapes import ellipseMesh, ellipseProfile, loopTuples, ringPoints
+
 def ellipse(vertices, center, r1, r2, z, distortCenter=False):
-    verts = []
-    edgesPerSide = vertices / 4
-    # add the top
-    for i in range(edgesPerSide):
-        x = 1.0 * i / edgesPerSide * 2 - 1
-        verts.append((x,-1.0))
-    # right
-    for i in range(edgesPerSide):
-        y = 1.0 * i / edgesPerSide * 2 - 1
-        verts.append((1.0, y))
-    # bottom
-    for i in range(edgesPerSide):
-        x = 1.0 * i / edgesPerSide * 2 - 1
-        verts.append((-x, 1.0))
-    # left
-    for i in range(edgesPerSide):
-        y = 1.0 * i / edgesPerSide * 2 - 1
-        verts.append((-1.0, -y))
-
-    e = []
-    for v in verts:
-        x = v[0]
-        y = v[1]
-        u = x * math.sqrt(1.0 - 0.5 * (y * y))
-        v = y * math.sqrt(1.0 - 0.5 * (x * x))
-        e.append((u, v))
+    e = np.array(ellipseProfile(vertices))
 
     if distortCenter:
         centerX = lerp(-1, 1, distortCenter)
-        for i,vert in enumerate(e):
-            x, y = vert
-            if x <= 0:
-                xp = norm(x, -1, 0)
-                x = lerp(-1, centerX, xp)
-            else:
-                xp = norm(x, 0, 1)
-                x = lerp(centerX, 1, xp)
-            e[i] = (x, y)
+        x = e[:, 0]
+        e[:, 0] = np.where(x <= 0, lerp(-1, centerX, norm(x, -1, 0)), lerp(centerX, 1, norm(x, 0, 1)))
 
     # convert to actual unit
-    for i,vert in enumerate(e):
-        u, v = vert
-        u = u * r1 + center[0]
-        v = v * r2 + center[1]
-        e[i] = (u,v,z)
-
-    return e
-
-def ellipseMesh(vertices, center, r1, r2, z, reverse=False):
-    verts = []
-    edgesPerSide = vertices / 4
-
-    # create a rectangular matrix of vertices mapped to circular disc coordinates (UV)
-    # https://stackoverflow.com/questions/13211595/how-can-i-convert-coordinates-on-a-circle-to-coordinates-on-a-square
-    for row in range(edgesPerSide+1):
-        for col in range(edgesPerSide+1):
-            # x, y is between -1 and 1
-            x = 1.0 * col / edgesPerSide * 2 - 1
-            y = 1.0 * row / edgesPerSide * 2 - 1
-            u = x * math.sqrt(1.0 - 0.5 * (y * y))
-            v = y * math.sqrt(1.0 - 0.5 * (x * x))
-            # convert to actual unit
-            u = u * r1 + center[0]
-            v = v * r2 + center[1]
-            verts.append((u,v,z))
-
-    vertLen = len(verts)
-    centerIndex = int(vertLen / 2)
-    centerRow = edgesPerSide / 2
-    centerCol = edgesPerSide/ 2
-
-    # start with one point at the center
-    edgeLoops = [[verts[centerIndex]]]
-
-    # add loops until we reach outer loop
-    edges = 2
-    while edges <= edgesPerSide:
-        edgeLoop = []
-        r = edges/2
-        # add top
-        for i in range(edges):
-            row = centerRow - r
-            col = centerCol + lerp(-r, r, 1.0 * i / edges)
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add right
-        for i in range(edges):
-            row = centerRow + lerp(-r, r, 1.0 * i / edges)
-            col = centerCol + r
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add bottom
-        for i in range(edges):
-            row = centerRow + r
-            col = centerCol + lerp(r, -r, 1.0 * i / edges)
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add left
-        for i in range(edges):
-            row = centerRow + lerp(r, -r, 1.0 * i / edges)
-            col = centerCol - r
-            i = int(row*(edgesPerSide+1) + col)
-            edgeLoop.append(verts[i])
-
-        # add edges
-        edgeLoops.append(edgeLoop)
-        edges += 2
-
-    if reverse:
-        edgeLoops = reversed(edgeLoops)
-
-    return edgeLoops
+    return loopTuples(ringPoints(e, (r1, r2), center, z))
 
 def lerp(a, b, mu):
     return (b-a) * mu + a
@@ -146,13 +45,6 @@ def readCSV(filename):
                         rows[i][key] = value
     return rows
 
-def roundP(vList, precision):
-    rounded = []
-    for v in vList:
-        t = (round(v[0], precision), round(v[1], precision), round(v[2], precision))
-        rounded.append(t)
-    return rounded
-
 # north => -90 degrees or 270 degrees
 def translatePoint(p, degrees, distance):
     radians = math.radians(degrees)
@@ -160,13 +52,10 @@ def translatePoint(p, degrees, distance):
     y2 = p[1] + distance * math.sin(radians)
     return (x2, y2)
 
-class Mesh:
+class Mesh(BaseMesh):
 
     def __init__(self):
-        self.verts = []
-        self.edges = []
-        self.faces = []
-        self.edgeLoops = []
+        BaseMesh.__init__(self)
         self.offsets = []
         self.closedLoops = []
 
@@ -259,7 +148,8 @@ class Mesh:
         # north side
         faces.append((aVertOffset+partialLoopLen-1, bVertOffset+partialLoopLen-1, cVertOffset+partialLoopLen-1, dVertOffset+partialLoopLen-1))
 
-        self.faces += faces
+        self.addFaces(faces)
+        self.orientFaces()
         return faces
 
     def joinEdgeLoops(self, a, b, indexOffset):
@@ -371,7 +261,7 @@ class Mesh:
                     v3 = aLen
                 faces.append((v1+indexOffset, v2+indexOffset, v3+indexOffset, v4+indexOffset))
 
-        self.faces += faces
+        self.addFaces(faces)
 
     # join all the edge loop together
     def processEdgeloops(self):
@@ -386,11 +276,11 @@ class Mesh:
                 loop = edgeLoop[offset[0]:offset[1]]
 
             # add loop's vertices
-            self.verts += loop
+            self.appendVerts(loop)
 
             # if this is the first edge loop and it's a quad, add it's face
             if i == 0 and len(loop) == 4:
-                self.faces.append(range(4))
+                self.addFace(range(4))
 
             elif i > 0:
                 offsetBefore = self.offsets[i-1]
@@ -403,7 +293,9 @@ class Mesh:
 
         # if the last edge loop is a quad, add it's face
         if len(self.edgeLoops[-1]) == 4:
-            self.faces.append([(i+indexOffset) for i in range(4)])
+            self.addFace([(i+indexOffset) for i in range(4)])
+
+        self.orientFaces()
 
     def removeLoop(self, index):
         removed = self.edgeLoops.pop(index)
@@ -513,11 +405,3 @@ class Mesh:
         for i, edgeLoop in enumerate(self.edgeLoops):
             for j, v in enumerate(edgeLoop):
                 self.edgeLoops[i][j] = (v[0]+x, v[1]+y, v[2]+z)
-
-    def updateEdgeLoops(self, loops, offset0=None, offset1=None):
-        if offset0 is None and offset1 is None:
-            self.edgeLoops = loops[:]
-        else:
-            before = self.edgeLoops[:offset0]
-            after = self.edgeLoops[offset1:]
-            self.edgeLoops = before + loops + after
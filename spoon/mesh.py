@@ -6,7 +6,6 @@
     # 1850 to 1930 and 1960 to 1990
     # https://www.census.gov/population/www/documentation/twps0029/tab04.html
 
-import json
 from lib import *
 import numpy as np
 from pprint import pprint
@@ -14,7 +13,7 @@ from scipy import interpolate
 import sys
 
 # data config
-OUTPUT_FILE = "mesh.json"
+OUTPUT_FILE = "mesh.bin"
 DATA_FILE = "data.csv"
 VALUE_KEY = "percent"
 DATA_PRECISION = 3
@@ -250,23 +249,15 @@ mesh.processEdgeloops()
 print "Closing open loops..."
 facesAdded = mesh.closeOpenLoops()
 
-# Flip the faces of the first circle mesh
-flipFaces = range((VERTICES_PER_EDGE_LOOP/4)**2)
-
-# TODO: flip the faces of the north side of the closed open loops
-
 # save data
 data = [
     {
         "name": "Spoon",
-        "verts": roundP(mesh.verts, PRECISION),
-        "edges": [],
+        "verts": np.round(mesh.verts, PRECISION),
         "faces": mesh.faces,
-        "location": CENTER,
-        "flipFaces": flipFaces
+        "location": CENTER
     }
 ]
 
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(data, f)
-    print "Wrote to file %s" % OUTPUT_FILE
+writeMeshFile(OUTPUT_FILE, data)
+print "Wrote to file %s" % OUTPUT_FILE
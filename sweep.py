@@ -0,0 +1,48 @@
+# Generates variants of a piece for every combination of some of its constants, in parallel, e.g.
+#   python sweep.py cup -set THICKNESS 4.8 5.2 -set DISPLACEMENT_DEPTH 3.0 3.4 -out sweeps/cup
+#   python sweep.py pot -set SUBDIVIDE_X 0 1 2
+#   python sweep.py -list pot
+# Variant i is written to <out>/<i>.bin (and any other files the script writes to <out>/<i>_<name>),
+# with its config and output files in <out>/manifest.json
+
+import argparse
+import ast
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from meshlib.sweep import parameterGrid, scriptConstants, scriptPath, sweep
+
+def parseValue(value):
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+parser = argparse.ArgumentParser()
+parser.add_argument('piece', help="Piece folder (e.g. cup) or a path to one of its scripts")
+parser.add_argument('-set', dest="PARAMS", nargs='+', action='append', default=[], metavar=("NAME", "VALUE"), help="A constant and the values to try")
+parser.add_argument('-out', dest="OUTPUT_DIR", default="", help="Folder for the variants (default is sweeps/<piece>)")
+parser.add_argument('-workers', dest="WORKERS", type=int, default=0, help="Variants to generate at once (default is one per core)")
+parser.add_argument('-list', dest="LIST", action="store_true", help="List the piece's constants and exit")
+parser.add_argument('-verbose', dest="VERBOSE", action="store_true", help="Show the script's output")
+args = parser.parse_args()
+
+if args.LIST:
+    print("\n".join(scriptConstants(scriptPath(args.piece))))
+    sys.exit(0)
+
+params = {}
+for p in args.PARAMS:
+    if len(p) < 2:
+        parser.error("-set needs a constant name and at least one value")
+    params[p[0]] = [parseValue(v) for v in p[1:]]
+
+outputDir = args.OUTPUT_DIR or os.path.join("sweeps", os.path.splitext(args.piece)[0])
+print("Generating %s variants of %s" % (len(parameterGrid(params)), args.piece))
+results = sweep(args.piece, params, outputDir, args.WORKERS, quiet=(not args.VERBOSE))
+failed = [r for r in results if "error" in r]
+for r in failed:
+    print("Variant %s failed:\n%s" % (r["index"], r["error"]))
+print("Wrote %s variants to %s" % (len(results) - len(failed), outputDir))
+sys.exit(1 if len(failed) > 0 else 0)